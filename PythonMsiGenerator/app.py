@@ -4,14 +4,22 @@ import subprocess
 import tempfile
 import uuid
 import shutil
+from pathlib import Path
+from xml.sax.saxutils import escape as xml_escape
 from werkzeug.utils import secure_filename
 
+def ensure_dirs(*paths):
+    """Create each directory (and its parents) unless it already exists"""
+    for path in paths:
+        if not os.path.isdir(path):
+            Path(path).mkdir(parents=True, exist_ok=True)
+
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size
 app.config['UPLOAD_FOLDER'] = 'temp_uploads'
 
 # Create temp directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+ensure_dirs(app.config['UPLOAD_FOLDER'])
 
 class ApplicationType:
     WEB_APPLICATION = "WebApplication"
@@ -20,6 +28,64 @@ class ApplicationType:
     POWERSHELL_SCRIPT = "PowerShellScript"
     DESKTOP_APPLICATION = "DesktopApplication"
 
+# Extra entities needed because config values end up inside "..." attributes
+XML_ATTR_ENTITIES = {'"': '&quot;'}
+
+def escape_config(config):
+    """Return a copy of config with every string value XML-escaped (nested dicts included)"""
+    escaped = {}
+    for key, value in config.items():
+        if isinstance(value, str):
+            escaped[key] = xml_escape(value, XML_ATTR_ENTITIES)
+        elif isinstance(value, dict):
+            escaped[key] = escape_config(value)
+        else:
+            escaped[key] = value
+    return escaped
+
+# Fixed parts of Product.wxs, joined once at import time
+WXS_HEADER = '\n'.join([
+    '<?xml version="1.0" encoding="UTF-8"?>',
+    '<Wix xmlns="http://wixtoolset.org/schemas/v4/wxs"',
+    '>',
+    '',
+])
+WXS_HEADER_IIS = '\n'.join([
+    '<?xml version="1.0" encoding="UTF-8"?>',
+    '<Wix xmlns="http://wixtoolset.org/schemas/v4/wxs"',
+    '     xmlns:iis="http://wixtoolset.org/schemas/v4/wxs/iis">',
+    '',
+])
+WXS_PACKAGE_OPEN = '\n'.join([
+    '',
+    '  <Package',
+    '    Name="$(var.AppName)"',
+    '    Version="$(var.AppVersion)"',
+    '    Manufacturer="$(var.CompanyName)"',
+    '    UpgradeCode="$(var.AppUpgradeCode)"',
+    '    Compressed="true"',
+    '    Scope="perMachine">',
+    '',
+])
+WXS_FILES = '\n'.join([
+    '',
+    '    <!-- Include all uploaded files -->',
+    '    <Files Include="$(SourceDir)\\**\\*.*" />',
+    '',
+])
+WXS_FOOTER = '\n'.join([
+    '    <Feature Id="Complete" Title="$(var.AppName)" Level="1">',
+    '      <!-- Components are automatically included -->',
+    '    </Feature>',
+    '',
+    '    <UI>',
+    '      <UIRef Id="WixUI_InstallDir" />',
+    '    </UI>',
+    '',
+    '  </Package>',
+    '</Wix>',
+])
+
 class WixGenerator:
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
@@ -28,7 +94,9 @@ class WixGenerator:
         """Generate MSI package based on configuration"""
         session_id = str(uuid.uuid4()).replace('-', '')
         session_dir = os.path.join(self.temp_dir, f"wix_session_{session_id}")
-        os.makedirs(session_dir, exist_ok=True)
+        files_dir = os.path.join(session_dir, "files")
+        # Creating files_dir also creates session_dir as its parent
+        ensure_dirs(files_dir)
         
         try:
             # Generate WiX source file
@@ -38,14 +106,13 @@ class WixGenerator:
             with open(wxs_path, 'w', encoding='utf-8') as f:
                 f.write(wxs_content)
             
-            # Save uploaded files
-            files_dir = os.path.join(session_dir, "files")
-            os.makedirs(files_dir, exist_ok=True)
-            
+            # Save uploaded files, looking these up once instead of on every uploaded file
+            join = os.path.join
+            safe_name = secure_filename
+
             for file in uploaded_files:
                 if file.filename:
-                    filename = secure_filename(file.filename)
-                    file.save(os.path.join(files_dir, filename))
+                    file.save(join(files_dir, safe_name(file.filename)))
             
             # Build MSI using wix.exe
             msi_path = os.path.join(session_dir, f"{config['application_name']}.msi")
@@ -61,70 +128,36 @@ class WixGenerator:
     
     def generate_wix_source(self, config):
         """Generate WiX v6 source code based on configuration"""
+        # Escape user values once here so the generators can interpolate them directly.
+        # The <?define ?> values stay raw: processing instructions are not entity-decoded.
+        raw_config = config
+        config = escape_config(config)
         app_type = config.get('app_type')
         
         # Start building WiX source
-        wxs = []
-        wxs.append('<?xml version="1.0" encoding="UTF-8"?>')
-        wxs.append('<Wix xmlns="http://wixtoolset.org/schemas/v4/wxs"')
-        
-        # Add namespaces based on app type
         if app_type in [ApplicationType.WEB_APPLICATION, ApplicationType.CUSTOM_WEBSITE]:
-            wxs.append('     xmlns:iis="http://wixtoolset.org/schemas/v4/wxs/iis">')
+            wxs = [WXS_HEADER_IIS]
         else:
-            wxs.append('>')
-        
-        wxs.append('')
-        wxs.append(f'  <?define AppName = "{config["application_name"]}" ?>')
-        wxs.append(f'  <?define AppVersion = "{config.get("version", "1.0.0.0")}" ?>')
-        wxs.append(f'  <?define CompanyName = "{config.get("manufacturer", "")}" ?>')
-        wxs.append(f'  <?define AppUpgradeCode = "{config.get("upgrade_code", str(uuid.uuid4()))}" ?>')
-        wxs.append('')
-        
-        # Package element
-        wxs.append('  <Package')
-        wxs.append('    Name="$(var.AppName)"')
-        wxs.append('    Version="$(var.AppVersion)"')
-        wxs.append('    Manufacturer="$(var.CompanyName)"')
-        wxs.append('    UpgradeCode="$(var.AppUpgradeCode)"')
-        wxs.append('    Compressed="true"')
-        wxs.append('    Scope="perMachine">')
-        wxs.append('')
+            wxs = [WXS_HEADER]
+
+        wxs.append(f'  <?define AppName = "{raw_config["application_name"]}" ?>')
+        wxs.append(f'  <?define AppVersion = "{raw_config.get("version", "1.0.0.0")}" ?>')
+        wxs.append(f'  <?define CompanyName = "{raw_config.get("manufacturer", "")}" ?>')
+        wxs.append(f'  <?define AppUpgradeCode = "{raw_config.get("upgrade_code", str(uuid.uuid4()))}" ?>')
+        wxs.append(WXS_PACKAGE_OPEN)
         
         # Installation location
         if config.get('install_location'):
             wxs.append(f'    <Property Id="INSTALLFOLDER" Value="{config["install_location"]}" />')
-        wxs.append('')
-        
-        # Files
-        wxs.append('    <!-- Include all uploaded files -->')
-        wxs.append('    <Files Include="$(SourceDir)\\**\\*.*" />')
-        wxs.append('')
+        wxs.append(WXS_FILES)
         
         # Generate components based on app type
-        if app_type == ApplicationType.WEB_APPLICATION:
-            wxs.extend(self.generate_web_app_components(config))
-        elif app_type == ApplicationType.CUSTOM_WEBSITE:
-            wxs.extend(self.generate_custom_website_components(config))
-        elif app_type == ApplicationType.WINDOWS_SERVICE:
-            wxs.extend(self.generate_service_components(config))
-        elif app_type == ApplicationType.POWERSHELL_SCRIPT:
-            wxs.extend(self.generate_powershell_components(config))
-        
-        # Feature
-        wxs.append('    <Feature Id="Complete" Title="$(var.AppName)" Level="1">')
-        wxs.append('      <!-- Components are automatically included -->')
-        wxs.append('    </Feature>')
-        wxs.append('')
+        generator = self._GENERATORS.get(app_type)
+        if generator:
+            wxs.extend(generator(self, config))
         
-        # UI
-        wxs.append('    <UI>')
-        wxs.append('      <UIRef Id="WixUI_InstallDir" />')
-        wxs.append('    </UI>')
-        wxs.append('')
-        
-        wxs.append('  </Package>')
-        wxs.append('</Wix>')
+        # Feature, UI and closing tags
+        wxs.append(WXS_FOOTER)
         
         return '\n'.join(wxs)
     
@@ -199,7 +232,8 @@ class WixGenerator:
         components.append(f'        DisplayName="{service_config.get("display_name", "$(var.AppName) Service")}"')
         components.append(f'        Description="{service_config.get("description", "")}"')
         components.append(f'        Start="{service_config.get("start_type", "auto")}"')
-        components.append(f'        Account="{service_config.get("account", "NT AUTHORITY\\LocalService")}"')
+        account = service_config.get("account", "NT AUTHORITY\\LocalService")
+        components.append(f'        Account="{account}"')
         components.append('        ErrorControl="ignore"')
         components.append('        Interactive="no" />')
         components.append('')
@@ -236,6 +270,14 @@ class WixGenerator:
         components.append('')
         
         return components
+
+    # Component generator for each application type
+    _GENERATORS = {
+        ApplicationType.WEB_APPLICATION: generate_web_app_components,
+        ApplicationType.CUSTOM_WEBSITE: generate_custom_website_components,
+        ApplicationType.WINDOWS_SERVICE: generate_service_components,
+        ApplicationType.POWERSHELL_SCRIPT: generate_powershell_components,
+    }
     
     def build_msi(self, wxs_path, msi_path, source_dir):
         """Build MSI using wix.exe command"""
@@ -246,14 +288,25 @@ class WixGenerator:
             '-bindpath', source_dir
         ]
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            print(f"WiX build successful: {result.stdout}")
-        except subprocess.CalledProcessError as e:
-            error_msg = f"WiX build failed: {e.stderr}\nOutput: {e.stdout}"
+        # Stream wix.exe output line by line so progress shows up while the
+        # build is still running instead of after it exits
+        output_lines = []
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              text=True, bufsize=1) as proc:
+            for line in proc.stdout:
+                line = line.rstrip()
+                print(f"[wix] {line}")
+                output_lines.append(line)
+            return_code = proc.wait()
+
+        output = '\n'.join(output_lines)
+        if return_code != 0:
+            error_msg = f"WiX build failed (exit code {return_code}):\n{output}"
             print(error_msg)
             raise Exception(error_msg)
 
+        print("WiX build successful")
+
 # Initialize the WiX generator
 wix_generator = WixGenerator()
 
@@ -353,5 +406,17 @@ def get_app_types():
     ]
     return jsonify(types)
 
+def run_server(host='0.0.0.0', port=5000):
+    """Serve the app with waitress, or the Flask dev server when FLASK_DEBUG is set"""
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    if not debug:
+        try:
+            from waitress import serve
+            serve(app, host=host, port=port, threads=8)
+            return
+        except ImportError:
+            print("waitress not installed, falling back to the Flask development server")
+    app.run(debug=debug, host=host, port=port, threaded=True)
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    run_server()
\ No newline at end of file
@@ -16,7 +16,7 @@ Then open: http://localhost:5000
 
 import os
 import sys
-from app import app
+from app import run_server
 
 if __name__ == '__main__':
     # Check if wix.exe is available
@@ -37,10 +37,5 @@ if __name__ == '__main__':
     # Create upload directory
     os.makedirs('temp_uploads', exist_ok=True)
     
-    # Run the Flask app
-    app.run(
-        debug=True,
-        host='0.0.0.0',
-        port=5001,
-        threaded=True
-    )
\ No newline at end of file
+    # Run the app (set FLASK_DEBUG=1 for the auto-reloading dev server)
+    run_server(host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -7,102 +7,143 @@ Similar to heat.exe functionality but with more control
 
 import os
 import uuid
-import xml.etree.ElementTree as ET
 from pathlib import Path
 import hashlib
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+# Look for xmlns="http://wixtoolset.org/schemas/vX/wxs"
+WIX_NAMESPACE_PATTERN = re.compile(r'xmlns="(http://wixtoolset\.org/schemas/v\d+/wxs)"')
+DEFAULT_WIX_NAMESPACE = "http://wixtoolset.org/schemas/v4/wxs"
+
+# WiX identifiers may only contain ASCII letters, digits and underscores
+INVALID_ID_CHARS = re.compile(r'[^0-9A-Za-z]')
+
+@lru_cache(maxsize=8192)
+def escape_attr(value):
+    """Escape a value for use inside a double-quoted XML attribute"""
+    return escape(value, {'"': '&quot;'})
+
+# Directory listings are I/O bound (especially on network shares), so they run on a small thread pool
+SCAN_WORKERS = 8
+
+def list_directory(directory):
+    """Return (file paths, subdirectory paths) of one directory, or None if it cannot be read"""
+    files = []
+    subdirs = []
+    try:
+        # os.scandir entries already carry their file type, so no extra stat() per entry
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.append(entry.path)
+                elif entry.is_dir():
+                    subdirs.append(entry.path)
+    except PermissionError:
+        return None
+    return files, subdirs
 
 class WixFilesGenerator:
-    def __init__(self, source_directory, output_file="Files.wxs", wix_namespace="http://wixtoolset.org/schemas/v4/wxs"):
+    def __init__(self, source_directory, output_file="Files.wxs", wix_namespace=DEFAULT_WIX_NAMESPACE):
         self.source_directory = Path(source_directory)
+        self.source_path = str(self.source_directory)
+        # Every scanned path starts with this prefix, so relative paths are a simple slice
+        self.source_prefix_len = len(os.path.join(self.source_path, ''))
         self.output_file = output_file
         self.wix_namespace = wix_namespace
-        self.components = []
+        # Only ever appended to and iterated once in order, so a deque avoids list regrowth copies
+        self.components = deque()
         self.directories = {}
         self.file_counter = 0
         self.dir_counter = 0
     
     def generate_guid(self, seed_text):
         """Generate deterministic GUID based on file path"""
-        hash_obj = hashlib.md5(seed_text.encode())
-        hash_hex = hash_obj.hexdigest()
+        # MD5 is only used as a stable ID here, which lets OpenSSL skip its FIPS checks
+        hash_hex = hashlib.md5(seed_text.encode(), usedforsecurity=False).hexdigest().upper()
         
         # Format as GUID: XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX
-        guid = f"{hash_hex[:8]}-{hash_hex[8:12]}-{hash_hex[12:16]}-{hash_hex[16:20]}-{hash_hex[20:32]}"
-        return guid.upper()
+        return f"{hash_hex[:8]}-{hash_hex[8:12]}-{hash_hex[12:16]}-{hash_hex[16:20]}-{hash_hex[20:]}"
     
     def get_relative_path(self, full_path):
-        """Get path relative to source directory"""
-        return str(Path(full_path).relative_to(self.source_directory))
+        """Get path relative to source directory (full_path must come from scanning it)"""
+        return full_path[self.source_prefix_len:]
     
-    def sanitize_id(self, name):
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def sanitize_id(name):
         """Convert file/folder name to valid WiX ID"""
-        # Remove invalid characters and spaces
-        sanitized = ''.join(c if c.isalnum() else '_' for c in name)
+        # Remove invalid characters and spaces (cached - folder names and extensions repeat a lot)
+        sanitized = INVALID_ID_CHARS.sub('_', name)
         # Ensure it starts with letter or underscore
         if sanitized and sanitized[0].isdigit():
             sanitized = '_' + sanitized
         return sanitized or 'EmptyName'
     
     def scan_directory(self, directory):
-        """Recursively scan directory and collect files and folders - FULLY DYNAMIC"""
-        directory = Path(directory)
+        """Scan the whole directory tree and collect files and folders - FULLY DYNAMIC"""
+        # Work with plain path strings from here on
+        directory = str(Path(directory))
         
-        if not directory.exists():
+        if not os.path.isdir(directory):
             print(f"Warning: Directory {directory} does not exist")
             return
         
+        # Walk the tree with an explicit stack instead of recursion. Subdirectories
+        # are pushed in reverse so they are still visited in directory order.
+        # Listings are fetched on a thread pool as soon as a directory is discovered,
+        # while components are still recorded here in a fixed order (IDs stay stable).
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            pending = [(directory, executor.submit(list_directory, directory))]
+            while pending:
+                path, listing = pending.pop()
+                subdirs = self.record_directory(path, listing.result())
+                for subdir in reversed(subdirs):
+                    pending.append((subdir, executor.submit(list_directory, subdir)))
+    
+    def record_directory(self, directory, listing):
+        """Record one scanned directory and its files; return its subdirectories"""
         print(f"Scanning: {directory}")
         
         # Track ALL directories in the hierarchy
-        rel_dir = self.get_relative_path(directory) if directory != self.source_directory else ""
+        rel_dir = self.get_relative_path(directory) if directory != self.source_path else ""
         if rel_dir:
             self.directories[rel_dir] = {
                 'path': rel_dir,
-                'name': directory.name,
+                'name': os.path.basename(directory),
                 'files': [],
                 'subdirs': [],
                 'empty': True,
-                'parent': str(Path(rel_dir).parent) if Path(rel_dir).parent != Path('.') else None
+                'parent': os.path.dirname(rel_dir) or None
             }
         
-        try:
-            items = list(directory.iterdir())
-            
-            # Process files first
-            files_in_dir = []
-            dirs_in_dir = []
-            
-            for item in items:
-                if item.is_file():
-                    files_in_dir.append(item)
-                    if rel_dir:
-                        self.directories[rel_dir]['empty'] = False
-                        self.directories[rel_dir]['files'].append(item.name)
-                elif item.is_dir():
-                    dirs_in_dir.append(item)
-                    if rel_dir:
-                        self.directories[rel_dir]['empty'] = False
-                        self.directories[rel_dir]['subdirs'].append(item.name)
-            
-            # Add files as components
-            for file_path in files_in_dir:
-                self.add_file_component(file_path)
+        if listing is None:
+            print(f"Permission denied: {directory}")
+            return []
+        
+        files, subdirs = listing
+        for file_path in files:
+            self.add_file_component(file_path)
+        
+        if rel_dir:
+            dir_info = self.directories[rel_dir]
+            dir_info['files'] = [os.path.basename(path) for path in files]
+            dir_info['subdirs'] = [os.path.basename(path) for path in subdirs]
+            dir_info['empty'] = not files and not subdirs
             
-            # Process subdirectories recursively
-            for subdir in dirs_in_dir:
-                self.scan_directory(subdir)
-                    
             # Handle empty directories (preserve them)
-            if rel_dir and self.directories[rel_dir]['empty']:
+            if dir_info['empty']:
                 self.add_empty_directory_component(directory)
-                
-        except PermissionError:
-            print(f"Permission denied: {directory}")
+        
+        return subdirs
     
     def add_file_component(self, file_path):
         """Add a file component"""
         rel_path = self.get_relative_path(file_path)
-        file_name = file_path.name
+        file_name = os.path.basename(file_path)
         
         # Generate unique IDs
         component_id = f"File_{self.sanitize_id(file_name)}_{self.file_counter}"
@@ -118,7 +159,7 @@ class WixFilesGenerator:
             'file_id': file_id,
             'source': rel_path.replace('\\', '/'),  # Use forward slashes for source
             'name': file_name,
-            'directory': self.get_directory_id(file_path.parent)
+            'directory': self.get_directory_id(os.path.dirname(file_path))
         }
         
         self.components.append(component)
@@ -129,7 +170,7 @@ class WixFilesGenerator:
     def add_empty_directory_component(self, dir_path):
         """Add component for empty directory to preserve it"""
         rel_path = self.get_relative_path(dir_path)
-        dir_name = dir_path.name
+        dir_name = os.path.basename(dir_path)
         
         # Generate unique IDs
         component_id = f"EmptyDir_{self.sanitize_id(dir_name)}_{self.dir_counter}"
@@ -152,7 +193,7 @@ class WixFilesGenerator:
     
     def get_directory_id(self, dir_path):
         """Get or create directory ID for WiX"""
-        if dir_path == self.source_directory:
+        if os.fspath(dir_path) == self.source_path:
             return "INSTALLFOLDER"
         
         rel_path = self.get_relative_path(dir_path)
@@ -168,140 +209,113 @@ class WixFilesGenerator:
         return {}
     
     def generate_files_wxs(self):
-        """Generate the Files.wxs content"""
+        """Generate the Files.wxs content line by line"""
         print(f"\nGenerating Files.wxs...")
         print(f"Found {self.file_counter} files and {self.dir_counter} empty directories")
         
-        # Create root element
-        root = ET.Element("Wix")
-        root.set("xmlns", self.wix_namespace)
-        
-        # Add comment
-        comment = ET.Comment(f" Files.wxs - Auto-generated from {self.source_directory} ")
-        root.append(comment)
-        
-        # Create Fragment
-        fragment = ET.SubElement(root, "Fragment")
+        # The output schema is fixed, so yield the XML text directly instead of
+        # building (and then pretty-printing) a tree; lines go to disk as they are made
+        yield '<?xml version="1.0" encoding="UTF-8"?>'
+        yield f'<Wix xmlns="{escape_attr(self.wix_namespace)}">'
+        yield f'  <!-- Files.wxs - Auto-generated from {self.source_directory} -->'
+        yield '  <Fragment>'
         
         # Build complete directory tree dynamically from ALL discovered directories
         if self.directories:
-            # Create INSTALLFOLDER as root directory element
-            install_dir = ET.SubElement(fragment, "DirectoryRef")
-            install_dir.set("Id", "INSTALLFOLDER")
+            # Child directories of each directory ID, as (id, name) pairs
+            children = {"INSTALLFOLDER": []}
             
-            # Create mapping of directory elements
-            created_dirs = {"INSTALLFOLDER": install_dir}
+            # Split every directory path once. The scan records directories depth-first,
+            # so parents already come before their children and no sorting is needed.
+            split_paths = [rel_path.replace('\\', '/').split('/') for rel_path in self.directories]
             
-            # Get all directory paths and sort by depth (parents first)
-            all_paths = list(self.directories.keys())
-            sorted_paths = sorted(all_paths, key=lambda x: x.count(os.sep))
-            
-            print(f"Creating directory structure for paths: {sorted_paths}")
+            print(f"Creating directory structure for paths: {list(self.directories)}")
             
             # Create directory tree incrementally
-            for rel_path in sorted_paths:
-                # Normalize path separators for consistent processing
-                normalized_path = rel_path.replace('\\', '/')
-                parts = normalized_path.split('/')
-                
-                # Build each level of the directory hierarchy
-                cumulative_path = []
-                parent_element = install_dir
+            for parts in split_paths:
+                # Build each level of the directory hierarchy, extending the
+                # parent's ID instead of re-deriving it from the full path
+                current_id = "Dir"
+                parent_id = "INSTALLFOLDER"
                 
                 for part in parts:
-                    cumulative_path.append(part)
-                    current_rel_path = '/'.join(cumulative_path)
-                    current_id = self.get_directory_id(self.source_directory / current_rel_path.replace('/', os.sep))
+                    current_id = f"{current_id}_{self.sanitize_id(part)}"
                     
                     # Only create if not already created
-                    if current_id not in created_dirs:
+                    if current_id not in children:
                         print(f"  Creating Directory: Id='{current_id}' Name='{part}'")
-                        directory = ET.SubElement(parent_element, "Directory")
-                        directory.set("Id", current_id)
-                        directory.set("Name", part)
-                        created_dirs[current_id] = directory
-                        parent_element = directory
-                    else:
-                        parent_element = created_dirs[current_id]
+                        children[parent_id].append((current_id, part))
+                        children[current_id] = []
+                    parent_id = current_id
+            
+            yield '    <DirectoryRef Id="INSTALLFOLDER">'
+            yield from self.generate_directory_lines(children, "INSTALLFOLDER", "      ")
+            yield '    </DirectoryRef>'
         
         # Create ComponentGroup
-        comp_group = ET.SubElement(fragment, "ComponentGroup")
-        comp_group.set("Id", "WebApplicationFiles")
-        comp_group.set("Directory", "INSTALLFOLDER")
-        
-        # Add all components
-        for component in self.components:
-            comp_elem = ET.SubElement(comp_group, "Component")
-            comp_elem.set("Id", component['id'])
-            comp_elem.set("Guid", component['guid'])
-            
-            # Set Directory attribute if component is not in INSTALLFOLDER
-            if component['directory'] != "INSTALLFOLDER":
-                comp_elem.set("Directory", component['directory'])
+        if not self.components:
+            yield '    <ComponentGroup Id="WebApplicationFiles" Directory="INSTALLFOLDER" />'
+        else:
+            yield '    <ComponentGroup Id="WebApplicationFiles" Directory="INSTALLFOLDER">'
+            source_prefix = escape_attr(self.source_directory.name)
             
-            if component['type'] == 'file':
-                file_elem = ET.SubElement(comp_elem, "File")
-                file_elem.set("Id", component['file_id'])
-                file_elem.set("Source", f"{self.source_directory.name}/{component['source']}")
-                file_elem.set("Name", component['name'])
+            # Add all components
+            for component in self.components:
+                # Set Directory attribute if component is not in INSTALLFOLDER
+                if component['directory'] != "INSTALLFOLDER":
+                    yield f'      <Component Id="{component["id"]}" Guid="{component["guid"]}" Directory="{component["directory"]}">'
+                else:
+                    yield f'      <Component Id="{component["id"]}" Guid="{component["guid"]}">'
                 
-            elif component['type'] == 'empty_directory':
-                # Use CreateFolder to preserve empty directories
-                folder_elem = ET.SubElement(comp_elem, "CreateFolder")
-                # Set the Directory attribute to the specific directory ID
-                folder_elem.set("Directory", component['directory'])
+                if component['type'] == 'file':
+                    yield f'        <File Id="{component["file_id"]}" Source="{source_prefix}/{escape_attr(component["source"])}" Name="{escape_attr(component["name"])}" />'
+                    
+                elif component['type'] == 'empty_directory':
+                    # Use CreateFolder to preserve empty directories
+                    yield f'        <CreateFolder Directory="{component["directory"]}" />'
+                
+                yield '      </Component>'
+            
+            yield '    </ComponentGroup>'
         
-        return root
+        yield '  </Fragment>'
+        yield '</Wix>'
+    
+    def generate_directory_lines(self, children, parent_id, indent):
+        """Generate nested <Directory> elements below parent_id"""
+        for dir_id, name in children[parent_id]:
+            if children[dir_id]:
+                yield f'{indent}<Directory Id="{dir_id}" Name="{escape_attr(name)}">'
+                yield from self.generate_directory_lines(children, dir_id, indent + "  ")
+                yield f'{indent}</Directory>'
+            else:
+                yield f'{indent}<Directory Id="{dir_id}" Name="{escape_attr(name)}" />'
     
     def write_files_wxs(self):
         """Write the Files.wxs file"""
-        root = self.generate_files_wxs()
-        
-        # Create XML tree with pretty formatting
-        self.indent_xml(root)
-        tree = ET.ElementTree(root)
-        
-        # Write to file with XML declaration
-        with open(self.output_file, 'wb') as f:
-            f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
-            tree.write(f, encoding='utf-8', xml_declaration=False)
+        # A 1 MB buffer turns the many small line writes into few large write() calls
+        with open(self.output_file, 'w', encoding='utf-8', newline='\n', buffering=1 << 20) as f:
+            f.writelines(f"{line}\n" for line in self.generate_files_wxs())
         
         print(f"SUCCESS: Generated {self.output_file}")
         print(f"   Components: {len(self.components)}")
         print(f"   Files: {self.file_counter}")
         print(f"   Empty Dirs: {self.dir_counter}")
-    
-    def indent_xml(self, elem, level=0):
-        """Add pretty formatting to XML"""
-        i = "\n" + level * "  "
-        if len(elem):
-            if not elem.text or not elem.text.strip():
-                elem.text = i + "  "
-            if not elem.tail or not elem.tail.strip():
-                elem.tail = i
-            for elem in elem:
-                self.indent_xml(elem, level + 1)
-            if not elem.tail or not elem.tail.strip():
-                elem.tail = i
-        else:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = i
 
 def detect_wix_namespace(product_wxs_path="Product.wxs"):
     """Detect WiX namespace from Product.wxs file"""
     try:
         with open(product_wxs_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Look for xmlns="http://wixtoolset.org/schemas/vX/wxs"
-            import re
-            match = re.search(r'xmlns="(http://wixtoolset\.org/schemas/v\d+/wxs)"', content)
+            # The namespace is declared on the opening <Wix> element, so the start of the file is enough
+            content = f.read(8192)
+            match = WIX_NAMESPACE_PATTERN.search(content)
             if match:
                 return match.group(1)
     except Exception as e:
         print(f"Warning: Could not detect namespace from {product_wxs_path}: {e}")
     
     # Default fallback
-    return "http://wixtoolset.org/schemas/v4/wxs"
+    return DEFAULT_WIX_NAMESPACE
 
 def main():
     """Main function"""
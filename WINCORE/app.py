@@ -4,65 +4,155 @@ Flask web application for managing JFrog polling system
 """
 
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 from datetime import datetime
 import threading
+import time
 from db_helper import DatabaseHelper
 from jfrog_config import JFrogConfig
-from polling_engine import PollingEngine
+from polling_engine import PollingEngine, summarize_results
 from cleanup_manager import CleanupManager
 from jfrog_url_builder import JFrogUrlBuilder
 from ssp_client import SSPClient
 
+# orjson is optional; it serializes the JSON API responses several times faster
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Flask-Compress is optional; it gzip/brotli-compresses the larger pages and JSON responses
+try:
+    from flask_compress import Compress
+    HAS_COMPRESS = True
+except ImportError:
+    HAS_COMPRESS = False
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """jsonify() through orjson; dates and other extra types still go through Flask's default()"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.secret_key = 'jfrog-polling-secret-key-change-in-production'
+if HAS_ORJSON:
+    app.json = ORJSONProvider(app)
+if HAS_COMPRESS:
+    app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html']
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    Compress(app)
+
+# Compiled template bytecode is kept on disk for the next start. Jinja picks
+# a private per-user folder and checks its ownership; template auto-reload
+# is left to Flask (on only in debug mode)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
 
 # Global instances
 db = None
 jfrog_config = None
 polling_engine = None
 cleanup_manager = None
+url_builder = None
+ssp_client = None
 polling_thread = None
+init_lock = threading.Lock()
+
+# Short-lived cache for the read-only dashboard queries; auto-refreshing
+# pages would otherwise re-run the same SELECTs several times a second
+QUERY_CACHE_TTL_SECONDS = 5
+query_cache = {}
+query_cache_lock = threading.Lock()
+
+def cached_query(cache_key, load):
+    """Return the cached result for cache_key, calling load() if it is missing or expired"""
+    now = time.monotonic()
+    with query_cache_lock:
+        entry = query_cache.get(cache_key)
+        if entry and now - entry[0] < QUERY_CACHE_TTL_SECONDS:
+            return entry[1]
+
+    result = load()
+    with query_cache_lock:
+        query_cache[cache_key] = (now, result)
+    return result
+
+def clear_query_cache():
+    """Drop all cached query results (call after changing data)"""
+    with query_cache_lock:
+        query_cache.clear()
 
 def init_app():
-    """Initialize application components"""
+    """Initialize application components (only once, even with concurrent callers)"""
     global db, jfrog_config, polling_engine, cleanup_manager, url_builder, ssp_client
 
-    db = DatabaseHelper()
-    if db.connect():
+    with init_lock:
+        if db:
+            return True
+
+        new_db = DatabaseHelper()
+        if not new_db.connect():
+            return False
+
         ssp_client = SSPClient()
-        jfrog_config = JFrogConfig(db)
-        polling_engine = PollingEngine(db)
-        cleanup_manager = CleanupManager(db)
-        url_builder = JFrogUrlBuilder(db, ssp_client)
+        jfrog_config = JFrogConfig(new_db)
+        polling_engine = PollingEngine(new_db)
+        cleanup_manager = CleanupManager(new_db)
+        url_builder = JFrogUrlBuilder(new_db, ssp_client)
+        # Set db last so other threads never see a half-initialized app
+        db = new_db
         return True
-    return False
+
+# Initialize once at startup instead of checking in every route
+with app.app_context():
+    init_app()
+
+@app.before_request
+def ensure_initialized():
+    """Retry initialization if the database was unreachable at startup"""
+    if not db and not init_app():
+        return "Database connection unavailable", 503
+
+@app.teardown_appcontext
+def release_db_connection(exc):
+    """Close this request thread's connection; the threaded server uses a new thread per request"""
+    if db:
+        db.release_connection()
 
 @app.route('/')
 def dashboard():
     """Main dashboard"""
-    if not db:
-        init_app()
+    # Active configs, recent logs and the build summary in one round trip
+    result_sets = cached_query('dashboard', lambda: db.execute_batch("""
+        SET NOCOUNT ON;
 
-    # Get statistics
-    configs = db.get_active_polling_config()
+        EXEC sp_GetActivePollingConfig;
 
-    # Get recent logs
-    recent_logs = db.execute_query("""
         SELECT TOP 10
             log_level, log_message, operation_type, log_date
         FROM jfrog_polling_log
-        ORDER BY log_date DESC
-    """)
+        ORDER BY log_date DESC;
 
-    # Get build tracking summary
-    build_summary = db.execute_query("""
         SELECT
             COUNT(*) as total_tracked,
             SUM(CASE WHEN download_status = 'completed' THEN 1 ELSE 0 END) as downloaded,
             SUM(CASE WHEN extraction_status = 'completed' THEN 1 ELSE 0 END) as extracted,
             SUM(CASE WHEN download_status = 'failed' THEN 1 ELSE 0 END) as failed
-        FROM jfrog_build_tracking
-    """)
+        FROM jfrog_build_tracking;
+    """))
+
+    if len(result_sets) == 3:
+        configs, recent_logs, build_summary = result_sets
+    else:
+        configs, recent_logs, build_summary = [], [], []
 
     stats = {
         'active_components': len(configs),
@@ -76,9 +166,6 @@ def dashboard():
 @app.route('/url-preview')
 def url_preview_page():
     """URL Preview Page"""
-    if not db:
-        init_app()
-
     # Get all active components with project info
     query = """
         SELECT 
@@ -97,9 +184,6 @@ def url_preview_page():
 @app.route('/api/component/<int:component_id>/jfrog_url_preview')
 def preview_jfrog_url(component_id):
     """Preview JFrog URL for component"""
-    if not db:
-        init_app()
-
     try:
         branch = request.args.get('branch')
         build_number = request.args.get('build')
@@ -122,11 +206,9 @@ def preview_jfrog_url(component_id):
 @app.route('/config')
 def config():
     """Configuration page"""
-    if not db:
-        init_app()
-
     # Get all system config
-    system_config = db.execute_query("SELECT * FROM jfrog_system_config WHERE is_enabled = 1")
+    system_config = cached_query('system_config', lambda: db.execute_query(
+        "SELECT * FROM jfrog_system_config WHERE is_enabled = 1"))
 
     config_dict = {}
     for item in system_config:
@@ -149,41 +231,28 @@ def config():
 @app.route('/config/update', methods=['POST'])
 def update_config():
     """Update configuration"""
-    if not db:
-        init_app()
-
     # Get form data
-    jfrog_url = request.form.get('JFrogBaseURL')
     ssp_api_url = request.form.get('SSP_API_URL')
     ssp_api_token = request.form.get('SSP_API_TOKEN')
-    base_drive = request.form.get('BaseDrive')
-
-    # Update JFrog URL
-    if jfrog_url:
-        db.update_system_config('JFrogBaseURL', jfrog_url, 'web_ui')
 
     # Update SSP config
     if ssp_api_url:
         db.update_ssp_config(ssp_api_url, ssp_api_token if ssp_api_token else None)
 
-    # Update base drive
-    if base_drive:
-        db.update_system_config('BaseDrive', base_drive, 'web_ui')
-    max_threads = request.form.get('MaxConcurrentThreads')
-    max_builds = request.form.get('MaxBuildsToKeep')
-
-    if jfrog_url:
-        db.update_system_config('JFrogBaseURL', jfrog_url, 'web_ui')
-    if username:
-        db.update_system_config('SVCJFROGUSR', username, 'web_ui')
-    if password:
-        db.update_system_config('SVCJFROGPAS', password, 'web_ui')
-    if base_drive:
-        db.update_system_config('BaseDrive', base_drive, 'web_ui')
-    if max_threads:
-        db.update_system_config('MaxConcurrentThreads', max_threads, 'web_ui')
-    if max_builds:
-        db.update_system_config('MaxBuildsToKeep', max_builds, 'web_ui')
+    # Form fields are named after their jfrog_system_config keys;
+    # save every filled-in value with a single UPDATE
+    config_keys = ['JFrogBaseURL', 'SVCJFROGUSR', 'SVCJFROGPAS', 'BaseDrive',
+                   'MaxConcurrentThreads', 'MaxBuildsToKeep']
+    updates = {}
+    for key in config_keys:
+        value = request.form.get(key)
+        if value:
+            updates[key] = value
+
+    if updates:
+        db.update_system_configs(updates, 'web_ui')
+
+    clear_query_cache()
 
     flash('Configuration updated successfully!', 'success')
     return redirect(url_for('config'))
@@ -191,9 +260,6 @@ def update_config():
 @app.route('/config/test')
 def test_connection():
     """Test JFrog connection"""
-    if not jfrog_config:
-        init_app()
-
     jfrog_config.load_config()
     success, message = jfrog_config.test_connection()
 
@@ -207,10 +273,7 @@ def test_connection():
 @app.route('/components')
 def components():
     """View all components"""
-    if not db:
-        init_app()
-
-    components_list = db.execute_query("""
+    components_list = cached_query('components', lambda: db.execute_query("""
         SELECT
             c.component_id,
             c.component_name,
@@ -228,16 +291,13 @@ def components():
         LEFT JOIN jfrog_build_tracking bt ON c.component_id = bt.component_id
         WHERE c.is_enabled = 1
         ORDER BY c.component_name
-    """)
+    """))
 
     return render_template('components.html', components=components_list)
 
 @app.route('/component/<int:component_id>')
 def component_detail(component_id):
     """Component detail page"""
-    if not db:
-        init_app()
-
     # Get component details
     component = db.execute_query("""
         SELECT
@@ -280,34 +340,25 @@ def component_detail(component_id):
 @app.route('/logs')
 def logs():
     """View polling logs"""
-    if not db:
-        init_app()
-
     # Get filter parameters
     log_level = request.args.get('level', 'all')
-    limit = int(request.args.get('limit', 100))
-
-    query = "SELECT TOP ? * FROM jfrog_polling_log"
-    params = [limit]
-
-    if log_level != 'all':
-        query += " WHERE log_level = ?"
-        params.append(log_level)
-
-    query += " ORDER BY log_date DESC"
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 100, type=int)
+    before_id = request.args.get('before_id', type=int)
 
-    logs_list = db.execute_query(query, tuple(params))
+    # Older pages are reached by before_id (keyset); page is for direct jumps
+    logs_page = db.get_polling_logs(page=page, per_page=per_page, log_level=log_level,
+                                    before_id=before_id)
+    logs_list = logs_page['items']
 
-    return render_template('logs.html', logs=logs_list, current_level=log_level)
+    return render_template('logs.html', logs=logs_list, pagination=logs_page,
+                           current_level=log_level)
 
 @app.route('/polling/start')
 def start_polling():
     """Start polling"""
     global polling_thread
 
-    if not polling_engine:
-        init_app()
-
     if polling_engine.is_running:
         flash('Polling is already running', 'warning')
     else:
@@ -323,9 +374,6 @@ def start_polling():
 @app.route('/polling/stop')
 def stop_polling():
     """Stop polling"""
-    if not polling_engine:
-        init_app()
-
     if polling_engine.is_running:
         polling_engine.stop()
         flash('Polling stopped successfully', 'success')
@@ -337,30 +385,26 @@ def stop_polling():
 @app.route('/polling/run')
 def run_single_poll():
     """Run single poll cycle"""
-    if not polling_engine:
-        init_app()
-
     polling_engine.start()
     results = polling_engine.poll_all_components()
     polling_engine.stop()
+    # The dashboard this redirects to should show the new builds
+    clear_query_cache()
 
-    successful = sum(1 for r in results if r.get('success'))
-    new_builds = sum(1 for r in results if r.get('new_build'))
+    counts = summarize_results(results)
 
-    flash(f'Poll completed: {successful} successful, {new_builds} new builds found', 'success')
+    flash(f"Poll completed: {counts['successful']} successful, {counts['new_builds']} new builds found", 'success')
     return redirect(url_for('dashboard'))
 
 @app.route('/cleanup/run')
 def run_cleanup():
     """Run cleanup"""
-    if not cleanup_manager:
-        init_app()
-
     result = cleanup_manager.cleanup_all_components()
+    clear_query_cache()
 
     if result['success']:
-        flash(f"Cleanup completed: {result['total_deleted']} items deleted, "
-              f"{result['total_space_freed'] / (1024*1024):.2f} MB freed", 'success')
+        flash(f"Cleanup completed: {result['total_deleted']} items deleted or queued for deletion, "
+              f"{result['total_space_freed'] / (1024*1024):.2f} MB to be freed", 'success')
     else:
         flash(f"Cleanup failed: {result.get('error')}", 'error')
 
@@ -369,48 +413,36 @@ def run_cleanup():
 @app.route('/api/stats')
 def api_stats():
     """API endpoint for statistics"""
-    if not db:
-        init_app()
-
-    stats = db.execute_query("""
+    stats = cached_query('component_stats', lambda: db.execute_query("""
         SELECT
             COUNT(*) as total_components,
             SUM(CASE WHEN polling_enabled = 1 THEN 1 ELSE 0 END) as polling_enabled_count
         FROM components
         WHERE is_enabled = 1
-    """)
+    """))
 
     return jsonify(stats[0] if stats else {})
 
 @app.route('/api/recent_activity')
 def api_recent_activity():
     """API endpoint for recent activity"""
-    if not db:
-        init_app()
-
-    activity = db.execute_query("""
+    # log_date is formatted by SQL Server (style 120 = 'yyyy-mm-dd hh:mi:ss'),
+    # so the rows are JSON-ready without a Python strftime per row
+    activity = cached_query('recent_activity', lambda: db.execute_query("""
         SELECT TOP 20
             log_level,
             log_message,
             operation_type,
-            log_date
+            CONVERT(varchar(19), log_date, 120) AS log_date
         FROM jfrog_polling_log
-        ORDER BY log_date DESC
-    """)
-
-    # Convert datetime to string for JSON serialization
-    for item in activity:
-        if item.get('log_date'):
-            item['log_date'] = item['log_date'].strftime('%Y-%m-%d %H:%M:%S')
+        ORDER BY jfrog_polling_log.log_date DESC
+    """))
 
     return jsonify(activity)
 
 @app.route('/component/<int:component_id>/toggle')
 def toggle_component(component_id):
     """Toggle component polling enabled/disabled"""
-    if not db:
-        init_app()
-
     # Get current status
     component = db.execute_query(
         "SELECT polling_enabled FROM components WHERE component_id = ?",
@@ -424,6 +456,9 @@ def toggle_component(component_id):
             (new_status, component_id)
         )
 
+        clear_query_cache()
+        polling_engine.invalidate_config_cache()
+
         status_text = 'enabled' if new_status else 'disabled'
         flash(f'Component polling {status_text}', 'success')
 
@@ -0,0 +1,145 @@
+"""
+Async Deleter Module
+Removes folders in the background by moving them into a trash folder first
+"""
+
+import atexit
+import os
+import queue
+import shutil
+import stat
+import subprocess
+import threading
+import uuid
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Trash folder created at the root of each drive
+TRASH_FOLDER_NAME = '.trash'
+
+
+def _clear_readonly(func, path, exc_info):
+    """rmtree error handler: clear the read-only flag (Windows) and retry once"""
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+def remove_tree(path: str):
+    """
+    Delete a folder tree. On POSIX 'rm -rf' runs the per-file loop in native
+    code; it is started without a shell, so the path is never re-parsed.
+    Windows has no rmdir executable (only the cmd built-in, which would parse
+    the path), so there, and for anything rm leaves behind, shutil.rmtree is
+    used; read-only files it cannot remove are made writable and retried.
+    """
+    if os.name != 'nt':
+        try:
+            subprocess.run(['rm', '-rf', '--', path],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            logger.debug("rm failed for %s: %s", path, e)
+        if not os.path.lexists(path):
+            return
+
+    shutil.rmtree(path, onerror=_clear_readonly)
+
+
+class AsyncDeleter:
+    """
+    Deletes folders without blocking the caller.
+
+    A folder is renamed into {drive}/.trash/{uuid} (a single, quick rename on
+    the same drive) and a background thread does the slow delete later.
+    Leftovers of earlier runs are swept the first time a trash folder is
+    used, and the queue is drained at interpreter exit.
+    """
+
+    def __init__(self):
+        """Start the background worker thread"""
+        self.pending = queue.Queue()
+        self.swept_trash_dirs = set()
+        self.swept_lock = threading.Lock()
+        self.worker = threading.Thread(target=self._worker, name='AsyncDeleter', daemon=True)
+        self.worker.start()
+        atexit.register(self.wait)
+
+    def get_trash_dir(self, path: str) -> str:
+        """Trash folder on the same drive as path (so rename stays cheap)"""
+        drive, _ = os.path.splitdrive(os.path.abspath(path))
+        return os.path.join(drive + os.sep, TRASH_FOLDER_NAME)
+
+    def delete(self, path: str):
+        """
+        Move folder to trash and queue it for removal.
+        Falls back to a synchronous delete if the rename is not possible
+        (for example the trash folder is on a different device).
+        """
+        try:
+            trash_dir = self.get_trash_dir(path)
+            os.makedirs(trash_dir, exist_ok=True)
+            self.sweep_trash(trash_dir)
+            trash_path = os.path.join(trash_dir, uuid.uuid4().hex)
+            os.rename(path, trash_path)
+        except OSError as e:
+            logger.debug("Rename to trash failed for %s, deleting in place: %s", path, e)
+            remove_tree(path)
+            logger.info("Deleted folder: %s", path)
+            return
+
+        logger.debug("Moved %s to %s", path, trash_path)
+        self.pending.put((path, trash_path))
+
+    def sweep_trash(self, trash_dir: str):
+        """Queue entries left in trash_dir by earlier runs (once per trash folder)"""
+        with self.swept_lock:
+            if trash_dir in self.swept_trash_dirs:
+                return
+            self.swept_trash_dirs.add(trash_dir)
+            try:
+                with os.scandir(trash_dir) as entries:
+                    stale = [entry.path for entry in entries]
+            except OSError as e:
+                logger.debug("Cannot list trash folder %s: %s", trash_dir, e)
+                return
+
+        for trash_path in stale:
+            logger.info("Removing leftover trash: %s", trash_path)
+            self.pending.put((trash_path, trash_path))
+
+    def wait(self):
+        """Block until every queued folder has been removed"""
+        self.pending.join()
+
+    def _worker(self):
+        """Remove trashed folders one at a time"""
+        while True:
+            path, trash_path = self.pending.get()
+            try:
+                if os.path.isdir(trash_path) and not os.path.islink(trash_path):
+                    remove_tree(trash_path)
+                else:
+                    os.remove(trash_path)
+                logger.info("Deleted folder: %s", path)
+            except OSError as e:
+                logger.error("Failed to delete %s: %s", path, e)
+            finally:
+                self.pending.task_done()
+
+
+_deleter = None
+_deleter_lock = threading.Lock()
+
+
+def get_async_deleter() -> AsyncDeleter:
+    """Shared AsyncDeleter instance (created on first use)"""
+    global _deleter
+    with _deleter_lock:
+        if _deleter is None:
+            _deleter = AsyncDeleter()
+        return _deleter
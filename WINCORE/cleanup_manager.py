@@ -4,10 +4,14 @@ Handles cleanup of old builds (keeps last 5 builds only)
 """
 
 import os
-import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import groupby
+from operator import itemgetter
 from typing import List, Dict
 import logging
 from db_helper import DatabaseHelper
+from async_deleter import get_async_deleter
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +20,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on threads used to delete old builds
+MAX_DELETE_WORKERS = 16
+
+# os.fwalk is not available on Windows
+HAS_FWALK = hasattr(os, 'fwalk')
+
+# Groups bulk cleanup rows by component/branch
+build_key = itemgetter('component_id', 'branch_id')
+
 
 class CleanupManager:
     """Manages cleanup of old builds"""
@@ -23,32 +36,43 @@ class CleanupManager:
     def __init__(self, db_helper: DatabaseHelper):
         """Initialize with database helper"""
         self.db = db_helper
-        self.max_builds_to_keep = self.db.get_max_builds_to_keep()
+
+    @property
+    def max_builds_to_keep(self) -> int:
+        """MaxBuildsToKeep setting (read on use; DatabaseHelper caches it)"""
+        return self.db.get_max_builds_to_keep()
 
     def delete_file_or_folder(self, path: str) -> bool:
         """Delete file or folder safely"""
         try:
-            if not path or not os.path.exists(path):
-                logger.debug(f"Path does not exist: {path}")
+            if not path or not os.path.lexists(path):
+                logger.debug("Path does not exist: %s", path)
                 return True
 
-            if os.path.isfile(path):
+            if os.path.islink(path):
+                # Remove the link itself, never the tree it points to
+                os.unlink(path)
+                logger.info("Deleted link: %s", path)
+            elif os.path.isfile(path):
                 os.remove(path)
-                logger.info(f"Deleted file: {path}")
+                logger.info("Deleted file: %s", path)
             elif os.path.isdir(path):
-                shutil.rmtree(path)
-                logger.info(f"Deleted folder: {path}")
+                # Moved to trash now; the background deleter logs the removal
+                get_async_deleter().delete(path)
 
             return True
 
         except Exception as e:
-            logger.error(f"Failed to delete {path}: {str(e)}")
+            logger.error("Failed to delete %s: %s", path, e)
             return False
 
-    def cleanup_old_builds(self, component_id: int, branch_id: int) -> Dict[str, any]:
+    def cleanup_old_builds(self, component_id: int, branch_id: int,
+                           compute_space_freed: bool = False) -> Dict[str, any]:
         """
         Cleanup old builds for a component/branch
         Keeps only the last N builds (configurable, default 5)
+        space_freed is only measured (one extra walk per build) when
+        compute_space_freed is set; otherwise it is None
         Returns: Dictionary with cleanup statistics
         """
         try:
@@ -56,9 +80,27 @@ class CleanupManager:
             builds_to_delete = self.db.cleanup_old_builds(
                 component_id, branch_id, self.max_builds_to_keep
             )
+            return self.remove_builds(component_id, branch_id, builds_to_delete, compute_space_freed)
+
+        except Exception as e:
+            logger.error("Cleanup failed: %s", e)
+            return {
+                'success': False,
+                'deleted_count': 0,
+                'failed_count': 0,
+                'space_freed': 0,
+                'error': str(e)
+            }
 
+    def remove_builds(self, component_id: int, branch_id: int, builds_to_delete: List[Dict],
+                      compute_space_freed: bool = False) -> Dict[str, any]:
+        """
+        Remove already-retired builds of a component/branch from disk
+        Returns: Dictionary with cleanup statistics
+        """
+        try:
             if not builds_to_delete:
-                logger.debug(f"No builds to cleanup for component {component_id}, branch {branch_id}")
+                logger.debug("No builds to cleanup for component %s, branch %s", component_id, branch_id)
                 return {
                     'success': True,
                     'deleted_count': 0,
@@ -68,44 +110,60 @@ class CleanupManager:
 
             deleted_count = 0
             failed_count = 0
-            space_freed = 0
+            space_freed = 0 if compute_space_freed else None
+            paths_to_delete = []
 
             for build in builds_to_delete:
                 download_path = build.get('download_path')
                 extraction_path = build.get('extraction_path')
 
-                # Calculate space before deletion
-                if download_path and os.path.exists(download_path):
-                    space_freed += os.path.getsize(download_path)
+                # Calculate space before deletion (one stat for the zip)
+                if compute_space_freed:
+                    if download_path:
+                        try:
+                            space_freed += os.stat(download_path).st_size
+                        except OSError:
+                            pass
 
-                if extraction_path and os.path.exists(extraction_path):
-                    space_freed += self.get_folder_size(extraction_path)
+                    if extraction_path:
+                        space_freed += self.get_folder_size(extraction_path)
 
-                # Delete download file (.zip)
+                # Delete download file (.zip) and extraction folder
                 if download_path:
-                    if self.delete_file_or_folder(download_path):
-                        deleted_count += 1
-                    else:
-                        failed_count += 1
-
-                # Delete extraction folder
+                    paths_to_delete.append(download_path)
                 if extraction_path:
-                    if self.delete_file_or_folder(extraction_path):
-                        deleted_count += 1
-                    else:
-                        failed_count += 1
+                    paths_to_delete.append(extraction_path)
+
+            # Remove the builds in parallel; each rmtree spends most of its
+            # time waiting on the file system
+            if paths_to_delete:
+                workers = min(MAX_DELETE_WORKERS, len(paths_to_delete))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(self.delete_file_or_folder, path)
+                               for path in paths_to_delete]
+                    for future in as_completed(futures):
+                        if future.result():
+                            deleted_count += 1
+                        else:
+                            failed_count += 1
 
             # Log cleanup activity
+            log_message = f'Cleanup completed: {deleted_count} items deleted or queued for deletion'
+            if compute_space_freed:
+                log_message += f', {space_freed} bytes to be freed'
             self.db.log_polling_activity(
                 log_level='INFO',
-                log_message=f'Cleanup completed: {deleted_count} items deleted, {space_freed} bytes freed',
+                log_message=log_message,
                 component_id=component_id,
                 branch_id=branch_id,
                 operation_type='cleanup'
             )
 
-            logger.info(f"Cleanup completed for component {component_id}, branch {branch_id}")
-            logger.info(f"Deleted: {deleted_count}, Failed: {failed_count}, Space freed: {space_freed} bytes")
+            logger.info("Cleanup completed for component %s, branch %s", component_id, branch_id)
+            if compute_space_freed:
+                logger.info("Deleted: %s, Failed: %s, Space freed: %s bytes", deleted_count, failed_count, space_freed)
+            else:
+                logger.info("Deleted: %s, Failed: %s", deleted_count, failed_count)
 
             return {
                 'success': True,
@@ -115,7 +173,7 @@ class CleanupManager:
             }
 
         except Exception as e:
-            logger.error(f"Cleanup failed: {str(e)}")
+            logger.error("Cleanup failed: %s", e)
             return {
                 'success': False,
                 'deleted_count': 0,
@@ -124,53 +182,86 @@ class CleanupManager:
                 'error': str(e)
             }
 
+    def remove_builds_in_worker(self, component_id: int, branch_id: int,
+                                builds_to_delete: List[Dict]) -> Dict[str, any]:
+        """remove_builds for a pool thread; closes the thread's database connection afterwards"""
+        try:
+            return self.remove_builds(component_id, branch_id, builds_to_delete,
+                                      compute_space_freed=True)
+        finally:
+            self.db.release_connection()
+
     def get_folder_size(self, folder_path: str) -> int:
         """Calculate total size of a folder"""
         try:
             total_size = 0
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if os.path.exists(file_path):
-                        total_size += os.path.getsize(file_path)
+            if HAS_FWALK:
+                # POSIX: stat relative to each directory's file descriptor
+                for root, dirs, files, rootfd in os.fwalk(folder_path):
+                    for name in files:
+                        try:
+                            file_stat = os.stat(name, dir_fd=rootfd, follow_symlinks=False)
+                        except OSError:
+                            continue
+                        # Skip symlinks, as the scandir walk below does
+                        if stat.S_ISREG(file_stat.st_mode):
+                            total_size += file_stat.st_size
+                return total_size
+
+            stack = [folder_path]
+            while stack:
+                try:
+                    with os.scandir(stack.pop()) as entries:
+                        for entry in entries:
+                            if entry.is_file(follow_symlinks=False):
+                                total_size += entry.stat(follow_symlinks=False).st_size
+                            elif entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                except OSError:
+                    # Folder vanished or is unreadable; skip it
+                    continue
             return total_size
 
         except Exception as e:
-            logger.error(f"Failed to calculate folder size: {str(e)}")
+            logger.error("Failed to calculate folder size: %s", e)
             return 0
 
     def cleanup_all_components(self) -> Dict[str, any]:
         """Cleanup old builds for all components"""
         try:
-            # Get all active components
-            query = """
-                SELECT DISTINCT c.component_id, cb.branch_id
-                FROM components c
-                INNER JOIN component_branches cb ON c.component_id = cb.component_id
-                WHERE c.is_enabled = 1 AND cb.is_active = 1
-            """
-            components = self.db.execute_query(query)
+            # Retire old builds of every active component/branch in one call
+            builds = self.db.cleanup_old_builds_bulk(self.max_builds_to_keep)
 
             total_deleted = 0
             total_failed = 0
             total_space_freed = 0
             components_processed = 0
 
-            for component in components:
-                component_id = component['component_id']
-                branch_id = component['branch_id']
-
-                result = self.cleanup_old_builds(component_id, branch_id)
-
-                if result['success']:
-                    total_deleted += result['deleted_count']
-                    total_failed += result['failed_count']
-                    total_space_freed += result['space_freed']
-                    components_processed += 1
-
-            logger.info(f"Global cleanup completed: {components_processed} components processed")
-            logger.info(f"Total deleted: {total_deleted}, Total failed: {total_failed}")
-            logger.info(f"Total space freed: {total_space_freed} bytes ({total_space_freed / (1024*1024):.2f} MB)")
+            # Rows come back unordered; group them per component/branch
+            builds.sort(key=build_key)
+            groups = [(key, list(group)) for key, group in groupby(builds, key=build_key)]
+
+            # Clean up several components/branches at once so their file
+            # system and database waits overlap
+            if groups:
+                workers = min(len(groups), max(1, self.db.get_max_threads() // 4))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(self.remove_builds_in_worker, component_id, branch_id, group)
+                               for (component_id, branch_id), group in groups]
+                    for future in as_completed(futures):
+                        result = future.result()
+
+                        if result['success']:
+                            total_deleted += result['deleted_count']
+                            total_failed += result['failed_count']
+                            total_space_freed += result['space_freed']
+                            components_processed += 1
+
+            # Folders were only moved to trash; the background deleter removes
+            # them, so the totals below include space still being freed
+            logger.info("Global cleanup completed: %s components processed", components_processed)
+            logger.info("Total deleted or queued for deletion: %s, Total failed: %s", total_deleted, total_failed)
+            logger.info("Total space to be freed: %s bytes (%.2f MB)", total_space_freed, total_space_freed / (1024*1024))
 
             return {
                 'success': True,
@@ -181,7 +272,7 @@ class CleanupManager:
             }
 
         except Exception as e:
-            logger.error(f"Global cleanup failed: {str(e)}")
+            logger.error("Global cleanup failed: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -194,19 +285,25 @@ class CleanupManager:
             component_folder = os.path.join(base_drive, str(component_guid))
 
             if os.path.exists(component_folder):
-                shutil.rmtree(component_folder)
-                logger.info(f"Component folder deleted: {component_folder}")
+                # One rename here; the tree itself is removed in the background
+                get_async_deleter().delete(component_folder)
+                logger.info("Component folder queued for deletion: %s", component_folder)
                 return True
             else:
-                logger.debug(f"Component folder does not exist: {component_folder}")
+                logger.debug("Component folder does not exist: %s", component_folder)
                 return True
 
         except Exception as e:
-            logger.error(f"Failed to delete component folder: {str(e)}")
+            logger.error("Failed to delete component folder: %s", e)
             return False
 
-    def get_storage_statistics(self, component_id: int = None) -> Dict[str, any]:
-        """Get storage statistics for components"""
+    def get_storage_statistics(self, component_id: int = None, page: int = None,
+                               limit: int = None) -> Dict[str, any]:
+        """
+        Get storage statistics for components
+        For all components, page/limit return one page of rows (ordered by
+        component_id); the grand totals always cover every component.
+        """
         try:
             if component_id:
                 query = """
@@ -221,30 +318,58 @@ class CleanupManager:
                     WHERE c.component_id = ? AND bh.is_deleted = 0
                     GROUP BY c.component_id, c.component_name, c.component_guid
                 """
-                params = (component_id,)
-            else:
-                query = """
-                    SELECT
-                        c.component_id,
-                        c.component_name,
-                        c.component_guid,
-                        COUNT(bh.history_id) as total_builds,
-                        SUM(bh.file_size) as total_size
-                    FROM components c
-                    LEFT JOIN jfrog_build_history bh ON c.component_id = bh.component_id
-                    WHERE c.is_enabled = 1 AND (bh.is_deleted = 0 OR bh.is_deleted IS NULL)
-                    GROUP BY c.component_id, c.component_name, c.component_guid
-                """
-                params = None
+                results = self.db.execute_query(query, (component_id,))
+                return {
+                    'success': True,
+                    'statistics': results
+                }
+
+            # Grand totals and the requested page in one round trip; the
+            # totals are their own query so a page past the end still has them
+            from_clause = """
+                FROM components c
+                LEFT JOIN jfrog_build_history bh ON c.component_id = bh.component_id
+                WHERE c.is_enabled = 1 AND (bh.is_deleted = 0 OR bh.is_deleted IS NULL)
+            """
+            query = f"""
+                SET NOCOUNT ON;
+
+                SELECT
+                    COUNT(bh.history_id) as all_builds,
+                    SUM(bh.file_size) as all_size
+                {from_clause};
+
+                SELECT
+                    c.component_id,
+                    c.component_name,
+                    c.component_guid,
+                    COUNT(bh.history_id) as total_builds,
+                    SUM(bh.file_size) as total_size
+                {from_clause}
+                GROUP BY c.component_id, c.component_name, c.component_guid
+                ORDER BY c.component_id
+            """
+            params = ()
+            if limit:
+                query += " OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
+                params = ((max(page or 1, 1) - 1) * limit, limit)
+
+            result_sets = self.db.execute_batch(query, params)
+            if len(result_sets) != 2:
+                raise RuntimeError("Storage statistics query failed")
+            totals, results = result_sets
+            total_builds = totals[0]['all_builds'] if totals else 0
+            total_size = totals[0]['all_size'] if totals else 0
 
-            results = self.db.execute_query(query, params)
             return {
                 'success': True,
-                'statistics': results
+                'statistics': results,
+                'total_builds': total_builds,
+                'total_size': total_size or 0
             }
 
         except Exception as e:
-            logger.error(f"Failed to get storage statistics: {str(e)}")
+            logger.error("Failed to get storage statistics: %s", e)
             return {
                 'success': False,
                 'error': str(e)
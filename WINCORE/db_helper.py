@@ -4,10 +4,12 @@ Handles all database operations with MS SQL Server
 """
 
 import pyodbc
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 import logging
-from config import DB_CONFIG
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +18,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Most distinct statements a thread keeps a prepared cursor for
+MAX_CACHED_CURSORS = 64
+
+# Largest page the log and build history listings return
+MAX_PAGE_SIZE = 200
+
+# Let the ODBC driver manager reuse connections opened by worker threads
+pyodbc.pooling = True
+
+LOG_POLLING_ACTIVITY_SQL = """
+    EXEC sp_LogPollingActivity
+        @thread_id = ?,
+        @component_id = ?,
+        @branch_id = ?,
+        @log_level = ?,
+        @log_message = ?,
+        @build_date = ?,
+        @build_number = ?,
+        @operation_type = ?,
+        @duration_ms = ?
+"""
+
+# Same columns as sp_LogPollingActivity, for batched inserts
+INSERT_POLLING_LOG_SQL = """
+    INSERT INTO jfrog_polling_log
+    (thread_id, component_id, branch_id, log_level, log_message,
+     build_date, build_number, operation_type, duration_ms)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_BUILD_HISTORY_SQL = """
+    INSERT INTO jfrog_build_history
+    (component_id, branch_id, build_date, build_number, build_url,
+     download_path, extraction_path, file_size, checksum,
+     downloaded_time, extracted_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), GETDATE())
+"""
+
 
 class DatabaseHelper:
     """Database helper class for JFrog polling system operations"""
@@ -24,34 +64,37 @@ class DatabaseHelper:
         """Initialize database connection parameters"""
         # Use the working connection string format
         self.connection_string = r'DRIVER={ODBC Driver 17 for SQL Server};SERVER=SUMEETGILL7E47\MSSQLSERVER01;DATABASE=MSIFactory;Trusted_Connection=yes'
-        self.connection = None
+        # config_key -> (time fetched, value); see get_system_config
+        self._config_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._config_ttl = 60.0
+        # (time fetched, rows) of sp_GetActivePollingConfig; same TTL
+        self._polling_config_cache: Optional[Tuple[float, List[Dict]]] = None
+        # Each thread gets its own connection and cursors; see connection
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Bumped by disconnect() so threads open a fresh connection
+        self._generation = 0
 
     def get_connection_string(self) -> str:
         """Return the connection string for SQL Server"""
         return self.connection_string
 
-    def execute_query(self, query: str, params: tuple = None) -> Optional[List[Dict]]:
-        """Execute a query and return results as list of dictionaries"""
-        try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-
-            # If the query returns results
-            if cursor.description:
-                columns = [column[0] for column in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-            
-            return None
-
-        except Exception as e:
-            logger.error(f"Query execution failed: {str(e)}")
-            raise
+    @property
+    def connection(self) -> pyodbc.Connection:
+        """
+        Connection for the calling thread, opened on first use.
+        Worker threads no longer share (and serialize on) a single connection;
+        pyodbc pooling makes opening the per-thread connections cheap.
+        """
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.connection = pyodbc.connect(self.get_connection_string())
+            local.generation = self._generation
+            local.cursors = {}
+            with self._connections_lock:
+                self._connections.append(local.connection)
+        return local.connection
 
     def get_ssp_config(self) -> Tuple[Optional[str], Optional[str]]:
         """Get SSP API configuration"""
@@ -67,7 +110,7 @@ class DatabaseHelper:
                 return row.api_url, row.api_token
             return None, None
         except Exception as e:
-            logger.error(f"Error getting SSP config: {str(e)}")
+            logger.error("Error getting SSP config: %s", e)
             return None, None
 
     def update_ssp_config(self, api_url: str, api_token: Optional[str] = None) -> bool:
@@ -92,10 +135,10 @@ class DatabaseHelper:
                 else:
                     return False
 
-            self.connection.commit()
+            self.commit()
             return True
         except Exception as e:
-            logger.error(f"Error updating SSP config: {str(e)}")
+            logger.error("Error updating SSP config: %s", e)
             return False
 
     def get_component_info(self, component_id: int) -> Optional[Dict]:
@@ -130,7 +173,7 @@ class DatabaseHelper:
                 }
             return None
         except Exception as e:
-            logger.error(f"Error getting component info: {str(e)}")
+            logger.error("Error getting component info: %s", e)
             return None
 
     def get_branch_pattern(self, component_id: int, branch: str = None) -> Optional[str]:
@@ -155,7 +198,7 @@ class DatabaseHelper:
             row = cursor.fetchone()
             return row.path_pattern_override if row else None
         except Exception as e:
-            logger.error(f"Error getting branch pattern: {str(e)}")
+            logger.error("Error getting branch pattern: %s", e)
             return None
 
     def get_latest_build_number(self, component_id: int) -> Optional[int]:
@@ -173,126 +216,273 @@ class DatabaseHelper:
             row = cursor.fetchone()
             return int(row.build_number) if row else None
         except Exception as e:
-            logger.error(f"Error getting latest build number: {str(e)}")
+            logger.error("Error getting latest build number: %s", e)
             return None
 
-    def get_system_config(self, key: str) -> Optional[str]:
-        """Get system configuration value by key"""
-        try:
-            cursor = self.connection.cursor()
-            query = """
-                SELECT config_value
-                FROM jfrog_system_config
-                WHERE config_key = ? AND is_enabled = 1
-            """
-            cursor.execute(query, (key,))
-            
-            row = cursor.fetchone()
-            return row.config_value if row else None
-        except Exception as e:
-            logger.error(f"Error getting system config: {str(e)}")
-            return None
-        """Update SSP API configuration"""
-        try:
-            cursor = self.connection.cursor()
-            
-            # If token is not provided, only update URL
-            if api_token:
-                cursor.execute("""
-                    INSERT INTO [ssp_config] ([api_url], [api_token])
-                    VALUES (?, ?)
-                """, (api_url, api_token))
-            else:
-                # Get existing token
-                _, existing_token = self.get_ssp_config()
-                if existing_token:
-                    cursor.execute("""
-                        INSERT INTO [ssp_config] ([api_url], [api_token])
-                        VALUES (?, ?)
-                    """, (api_url, existing_token))
-                else:
-                    return False
-
-            self.connection.commit()
-            return True
-        except Exception as e:
-            logger.error(f"Error updating SSP config: {str(e)}")
-            return False
-
     def connect(self) -> bool:
         """Establish database connection"""
         try:
-            self.connection = pyodbc.connect(self.get_connection_string())
+            # Opens the connection for the calling thread
+            self.connection
             logger.info("Database connection established successfully")
             return True
         except Exception as e:
-            logger.error(f"Database connection failed: {str(e)}")
+            logger.error("Database connection failed: %s", e)
             return False
 
     def disconnect(self):
         """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+            self._generation += 1
+        logger.info("Database connection closed")
+
+    def release_connection(self):
+        """Close the calling thread's connection (for short-lived worker threads)"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            return
+
+        with self._connections_lock:
+            if local.connection in self._connections:
+                self._connections.remove(local.connection)
+        local.connection.close()
+        local.generation = None
+        local.connection = None
+        local.cursors = {}
+
+    def commit(self):
+        """Commit the calling thread's work, unless a transaction() is open"""
+        if not getattr(self._local, 'in_transaction', False):
+            self.connection.commit()
+
+    def rollback(self):
+        """Roll back the calling thread's work; an open transaction() is marked failed"""
+        if getattr(self._local, 'in_transaction', False):
+            self._local.transaction_failed = True
+        self.connection.rollback()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run the calling thread's writes inside the block as one transaction.
+        Their individual commits are deferred to a single commit at the end;
+        if the block raises or a write fails, everything is rolled back.
+        """
+        local = self._local
+        if getattr(local, 'in_transaction', False):
+            # Nested: part of the outer transaction
+            yield self
+            return
+
+        connection = self.connection
+        local.in_transaction = True
+        local.transaction_failed = False
+        try:
+            yield self
+        except Exception:
+            connection.rollback()
+            raise
+        else:
+            if local.transaction_failed:
+                connection.rollback()
+            else:
+                connection.commit()
+        finally:
+            local.in_transaction = False
+
+    def get_cursor(self, query: str) -> pyodbc.Cursor:
+        """
+        Return this thread's cursor for the given SQL text.
+        pyodbc keeps the last statement prepared on a cursor, so running the
+        same SQL again on the same cursor only sends the new parameters.
+        """
+        connection = self.connection
+        cursors = self._local.cursors
+
+        cursor = cursors.get(query)
+        if cursor is None:
+            if len(cursors) >= MAX_CACHED_CURSORS:
+                for old_cursor in cursors.values():
+                    old_cursor.close()
+                cursors.clear()
+            cursor = connection.cursor()
+            cursors[query] = cursor
+        return cursor
 
     def execute_query(self, query: str, params: tuple = None) -> List[Dict]:
         """Execute SELECT query and return results as list of dictionaries"""
         try:
-            cursor = self.connection.cursor()
+            cursor = self.get_cursor(query)
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
 
+            # Statements that return no rows (e.g. a procedure without a SELECT)
+            if not cursor.description:
+                return []
+
             # Get column names
-            columns = [column[0] for column in cursor.description]
+            columns = tuple(column[0] for column in cursor.description)
+
+            # Convert rows to dictionaries as they are read from the cursor
+            results = [dict(zip(columns, row)) for row in cursor]
+            return results
+
+        except Exception as e:
+            logger.error("Query execution failed: %s", e)
+            return []
+
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = 500) -> Iterator[Dict]:
+        """Execute SELECT query and yield rows as dictionaries, batch_size rows at a time"""
+        cursor = self.connection.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+            columns = tuple(column[0] for column in cursor.description)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+    def execute_batch(self, query: str, params: tuple = None) -> List[List[Dict]]:
+        """Execute a multi-statement batch and return every result set as a list of dictionaries"""
+        try:
+            cursor = self.connection.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
 
-            # Fetch all rows and convert to list of dictionaries
-            results = []
-            for row in cursor.fetchall():
-                results.append(dict(zip(columns, row)))
+            # Walk the result sets in order; statements without rows are skipped
+            result_sets = []
+            while True:
+                if cursor.description:
+                    columns = [column[0] for column in cursor.description]
+                    result_sets.append([dict(zip(columns, row)) for row in cursor.fetchall()])
+                if not cursor.nextset():
+                    break
 
             cursor.close()
-            return results
+            return result_sets
 
         except Exception as e:
-            logger.error(f"Query execution failed: {str(e)}")
+            logger.error("Batch execution failed: %s", e)
             return []
 
     def execute_non_query(self, query: str, params: tuple = None) -> bool:
         """Execute INSERT, UPDATE, DELETE query"""
         try:
-            cursor = self.connection.cursor()
+            cursor = self.get_cursor(query)
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
 
-            self.connection.commit()
-            cursor.close()
+            self.commit()
             return True
 
         except Exception as e:
-            logger.error(f"Non-query execution failed: {str(e)}")
-            self.connection.rollback()
+            logger.error("Non-query execution failed: %s", e)
+            self.rollback()
+            return False
+
+    def execute_many(self, query: str, params_list: List[Tuple]) -> bool:
+        """Execute the same INSERT/UPDATE for every parameter tuple in one batch"""
+        if not params_list:
+            return True
+
+        try:
+            cursor = self.get_cursor(query)
+            # Send all parameter rows as one array instead of one call per row
+            cursor.fast_executemany = True
+            cursor.executemany(query, params_list)
+
+            self.commit()
+            return True
+
+        except Exception as e:
+            logger.error("Batch non-query execution failed: %s", e)
+            self.rollback()
             return False
 
     def get_active_polling_config(self) -> List[Dict]:
-        """Get all active polling configurations"""
+        """Get all active polling configurations (cached for a short time)"""
+        cached = self._polling_config_cache
+        if cached and time.monotonic() - cached[0] < self._config_ttl:
+            return list(cached[1])
+
         query = "EXEC sp_GetActivePollingConfig"
-        return self.execute_query(query)
+        configs = self.execute_query(query)
+        # An empty list may be a failed query; read again next time
+        if configs:
+            self._polling_config_cache = (time.monotonic(), configs)
+        return list(configs)
+
+    def invalidate_polling_config(self):
+        """Drop the cached polling configurations"""
+        self._polling_config_cache = None
 
     def get_system_config(self, config_key: str) -> Optional[str]:
-        """Get system configuration value by key"""
+        """Get system configuration value by key (cached for a short time)"""
+        cached = self._config_cache.get(config_key)
+        if cached and time.monotonic() - cached[0] < self._config_ttl:
+            return cached[1]
+
         query = """
             SELECT config_value
             FROM jfrog_system_config
             WHERE config_key = ? AND is_enabled = 1
         """
         results = self.execute_query(query, (config_key,))
-        if results:
-            return results[0]['config_value']
-        return None
+        if not results:
+            # Unset key or failed query (execute_query returns [] for both);
+            # not cached, so a database hiccup cannot pin the fallback value
+            return None
+        value = results[0]['config_value']
+        self._config_cache[config_key] = (time.monotonic(), value)
+        return value
+
+    def get_system_configs(self, config_keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get several system configuration values in one round trip
+        Returns: {config_key: config_value}; keys that are not set map to None
+        """
+        if not config_keys:
+            return {}
+
+        placeholders = ', '.join(['?'] * len(config_keys))
+        query = f"""
+            SELECT config_key, config_value
+            FROM jfrog_system_config
+            WHERE config_key IN ({placeholders}) AND is_enabled = 1
+        """
+        rows = self.execute_query(query, tuple(config_keys))
+        found = {row['config_key']: row['config_value'] for row in rows}
+
+        # Later get_system_config calls for the keys found come from the
+        # cache; missing keys are not cached (the query may have failed)
+        now = time.monotonic()
+        for config_key, config_value in found.items():
+            self._config_cache[config_key] = (now, config_value)
+        return {config_key: found.get(config_key) for config_key in config_keys}
+
+    def invalidate_system_config(self, config_key: str = None):
+        """Drop one cached config value, or all of them"""
+        if config_key is None:
+            self._config_cache.clear()
+        else:
+            self._config_cache.pop(config_key, None)
 
     def update_system_config(self, config_key: str, config_value: str, updated_by: str = 'system') -> bool:
         """Update system configuration"""
@@ -301,7 +491,30 @@ class DatabaseHelper:
             SET config_value = ?, updated_date = GETDATE(), updated_by = ?
             WHERE config_key = ?
         """
-        return self.execute_non_query(query, (config_value, updated_by, config_key))
+        updated = self.execute_non_query(query, (config_value, updated_by, config_key))
+        self.invalidate_system_config(config_key)
+        return updated
+
+    def update_system_configs(self, config_values: Dict[str, str], updated_by: str = 'system') -> bool:
+        """Update several system configuration values in one round trip"""
+        if not config_values:
+            return True
+
+        # One (key, value) row per setting, joined against the config table
+        value_rows = ', '.join(['(?, ?)'] * len(config_values))
+        query = f"""
+            UPDATE c
+            SET config_value = v.config_value, updated_date = GETDATE(), updated_by = ?
+            FROM jfrog_system_config c
+            INNER JOIN (VALUES {value_rows}) AS v(config_key, config_value)
+                ON c.config_key = v.config_key
+        """
+        params = [updated_by]
+        for config_key, config_value in config_values.items():
+            params.extend([config_key, config_value])
+        updated = self.execute_non_query(query, tuple(params))
+        self.invalidate_system_config()
+        return updated
 
     def get_build_tracking(self, component_id: int, branch_id: int) -> Optional[Dict]:
         """Get build tracking information for a component/branch"""
@@ -314,6 +527,34 @@ class DatabaseHelper:
             return results[0]
         return None
 
+    def claim_build_for_retry(self, tracking_id: int) -> Optional[Dict]:
+        """
+        Atomically mark a tracked build's failed download/extraction as in progress
+        Returns the build (with the statuses it had before the claim, so the caller
+        knows what to retry) or None if nothing failed or another retry claimed it
+        """
+        query = """
+            UPDATE t
+            SET download_status = CASE WHEN t.download_status = 'failed' THEN 'downloading' ELSE t.download_status END,
+                extraction_status = CASE WHEN t.extraction_status = 'failed' THEN 'extracting' ELSE t.extraction_status END,
+                error_message = NULL,
+                updated_date = GETDATE()
+            OUTPUT inserted.tracking_id, inserted.component_id, inserted.branch_id,
+                   c.component_guid, c.component_name, inserted.build_url,
+                   inserted.latest_build_date AS build_date,
+                   inserted.latest_build_number AS build_number,
+                   inserted.download_path, inserted.extraction_path,
+                   deleted.download_status, deleted.extraction_status
+            FROM jfrog_build_tracking t
+            INNER JOIN components c ON c.component_id = t.component_id
+            WHERE t.tracking_id = ?
+                AND (t.download_status = 'failed' OR t.extraction_status = 'failed')
+        """
+        results = self.execute_query(query, (tracking_id,))
+        # The UPDATE runs in the connection's transaction
+        self.commit()
+        return results[0] if results else None
+
     def update_build_tracking(self, component_id: int, branch_id: int, build_date: str,
                              build_number: int, build_url: str, download_status: str = 'pending',
                              extraction_status: str = 'pending') -> bool:
@@ -334,8 +575,12 @@ class DatabaseHelper:
 
     def update_download_status(self, component_id: int, branch_id: int,
                                download_path: str, file_size: int,
-                               checksum: str = None) -> bool:
-        """Update download status after successful download"""
+                               checksum: str = None, log_message: str = None,
+                               build_date: str = None, build_number: int = None) -> bool:
+        """
+        Update download status after successful download
+        If log_message is given, the 'download' activity is logged in the same batch
+        """
         query = """
             UPDATE jfrog_build_tracking
             SET download_status = 'completed',
@@ -346,12 +591,18 @@ class DatabaseHelper:
                 updated_date = GETDATE()
             WHERE component_id = ? AND branch_id = ?
         """
-        return self.execute_non_query(query, (download_path, file_size, checksum,
-                                              component_id, branch_id))
+        params = (download_path, file_size, checksum, component_id, branch_id)
+        if log_message:
+            return self.execute_with_log(query, params, log_message, component_id, branch_id,
+                                         'download', build_date, build_number)
+        return self.execute_non_query(query, params)
 
     def update_extraction_status(self, component_id: int, branch_id: int,
-                                 extraction_path: str) -> bool:
-        """Update extraction status after successful extraction"""
+                                 extraction_path: str, log_message: str = None) -> bool:
+        """
+        Update extraction status after successful extraction
+        If log_message is given, the 'extraction' activity is logged in the same batch
+        """
         query = """
             UPDATE jfrog_build_tracking
             SET extraction_status = 'completed',
@@ -359,29 +610,45 @@ class DatabaseHelper:
                 updated_date = GETDATE()
             WHERE component_id = ? AND branch_id = ?
         """
-        return self.execute_non_query(query, (extraction_path, component_id, branch_id))
+        params = (extraction_path, component_id, branch_id)
+        if log_message:
+            return self.execute_with_log(query, params, log_message, component_id, branch_id,
+                                         'extraction')
+        return self.execute_non_query(query, params)
 
     def insert_build_history(self, component_id: int, branch_id: int, build_date: str,
                             build_number: int, build_url: str, download_path: str = None,
                             extraction_path: str = None, file_size: int = None,
                             checksum: str = None) -> bool:
         """Insert new build into history"""
-        query = """
-            INSERT INTO jfrog_build_history
-            (component_id, branch_id, build_date, build_number, build_url,
-             download_path, extraction_path, file_size, checksum,
-             downloaded_time, extracted_time)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), GETDATE())
-        """
         params = (component_id, branch_id, build_date, build_number, build_url,
                  download_path, extraction_path, file_size, checksum)
-        return self.execute_non_query(query, params)
+        return self.execute_non_query(INSERT_BUILD_HISTORY_SQL, params)
+
+    def insert_build_history_many(self, rows: List[Tuple]) -> bool:
+        """
+        Insert several builds into history in one round trip
+        Each row has the insert_build_history arguments in order:
+        (component_id, branch_id, build_date, build_number, build_url,
+         download_path, extraction_path, file_size, checksum)
+        """
+        return self.execute_many(INSERT_BUILD_HISTORY_SQL, rows)
 
     def cleanup_old_builds(self, component_id: int, branch_id: int,
                           max_builds: int = 5) -> List[Dict]:
         """Cleanup old builds and return paths to delete"""
         query = "EXEC sp_CleanupOldBuilds @component_id = ?, @branch_id = ?, @max_builds_to_keep = ?"
-        return self.execute_query(query, (component_id, branch_id, max_builds))
+        builds = self.execute_query(query, (component_id, branch_id, max_builds))
+        # The procedure also marks the builds deleted
+        self.commit()
+        return builds
+
+    def cleanup_old_builds_bulk(self, max_builds: int = 5) -> List[Dict]:
+        """Cleanup old builds for all active components/branches in one call"""
+        query = "EXEC sp_CleanupOldBuildsBulk @max_builds_to_keep = ?"
+        builds = self.execute_query(query, (max_builds,))
+        self.commit()
+        return builds
 
     def log_polling_activity(self, log_level: str, log_message: str,
                             thread_id: int = None, component_id: int = None,
@@ -389,21 +656,106 @@ class DatabaseHelper:
                             build_number: int = None, operation_type: str = None,
                             duration_ms: int = None) -> bool:
         """Log polling activity"""
-        query = """
-            EXEC sp_LogPollingActivity
-                @thread_id = ?,
-                @component_id = ?,
-                @branch_id = ?,
-                @log_level = ?,
-                @log_message = ?,
-                @build_date = ?,
-                @build_number = ?,
-                @operation_type = ?,
-                @duration_ms = ?
-        """
         params = (thread_id, component_id, branch_id, log_level, log_message,
                  build_date, build_number, operation_type, duration_ms)
-        return self.execute_non_query(query, params)
+        return self.execute_non_query(LOG_POLLING_ACTIVITY_SQL, params)
+
+    def log_polling_activity_many(self, rows: List[Tuple]) -> bool:
+        """
+        Log several polling activities in one batch (one round trip, one commit)
+        Each row has the sp_LogPollingActivity parameters in order:
+        (thread_id, component_id, branch_id, log_level, log_message,
+         build_date, build_number, operation_type, duration_ms)
+        """
+        return self.execute_many(INSERT_POLLING_LOG_SQL, rows)
+
+    def get_page(self, query: str, params: List, order_by: str,
+                 page: int = 1, per_page: int = 50) -> Dict:
+        """
+        One page of query's rows using OFFSET/FETCH, so only that page leaves the server
+        One extra row is fetched to tell whether a next page exists (no COUNT(*))
+        Returns: {'items', 'page', 'per_page', 'has_prev', 'has_next'}
+        """
+        page = max(1, page or 1)
+        per_page = max(1, min(per_page or 50, MAX_PAGE_SIZE))
+
+        query += f" ORDER BY {order_by} OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
+        rows = self.execute_query(query, tuple(params) + ((page - 1) * per_page, per_page + 1))
+
+        return {
+            'items': rows[:per_page],
+            'page': page,
+            'per_page': per_page,
+            'has_prev': page > 1,
+            'has_next': len(rows) > per_page
+        }
+
+    def get_polling_logs(self, page: int = 1, per_page: int = 50,
+                         log_level: str = None, component_id: int = None,
+                         before_id: int = None) -> Dict:
+        """
+        Newest polling log entries, one page at a time (see get_page)
+        With before_id, the page starts after that entry (keyset paging: a seek on
+        log_id instead of skipping OFFSET rows) and page is ignored
+        """
+        query = """
+            SELECT log_id, log_level, log_message, operation_type, component_id,
+                   branch_id, build_date, build_number, duration_ms, log_date
+            FROM jfrog_polling_log
+            WHERE 1 = 1
+        """
+        params = []
+
+        if log_level and log_level.upper() != 'ALL':
+            query += " AND log_level = ?"
+            params.append(log_level.upper())
+
+        if component_id:
+            query += " AND component_id = ?"
+            params.append(component_id)
+
+        if before_id:
+            query += " AND log_id < ?"
+            params.append(before_id)
+            result = self.get_page(query, params, 'log_id DESC', 1, per_page)
+            result['has_prev'] = True
+        else:
+            result = self.get_page(query, params, 'log_id DESC', page, per_page)
+
+        # Key for the next (older) page
+        result['next_before_id'] = result['items'][-1]['log_id'] if result['items'] else None
+        return result
+
+    def get_build_history(self, component_id: int = None, branch_id: int = None,
+                          page: int = 1, per_page: int = 50) -> Dict:
+        """Build history (deleted builds excluded), newest first, one page at a time"""
+        query = """
+            SELECT history_id, component_id, branch_id, build_date, build_number,
+                   build_url, download_path, extraction_path, file_size, checksum,
+                   downloaded_time, extracted_time, created_date
+            FROM jfrog_build_history
+            WHERE is_deleted = 0
+        """
+        params = []
+
+        if component_id:
+            query += " AND component_id = ?"
+            params.append(component_id)
+
+        if branch_id:
+            query += " AND branch_id = ?"
+            params.append(branch_id)
+
+        return self.get_page(query, params, 'build_date DESC, build_number DESC', page, per_page)
+
+    def execute_with_log(self, query: str, params: tuple, log_message: str,
+                         component_id: int, branch_id: int, operation_type: str,
+                         build_date: str = None, build_number: int = None) -> bool:
+        """Run a status update and its INFO log entry as one batch (one round trip, one commit)"""
+        batch = "SET NOCOUNT ON;\n" + query + ";\n" + LOG_POLLING_ACTIVITY_SQL
+        log_params = (None, component_id, branch_id, 'INFO', log_message,
+                      build_date, build_number, operation_type, None)
+        return self.execute_non_query(batch, tuple(params) + log_params)
 
     def get_jfrog_credentials(self) -> Tuple[str, str, str]:
         """Get JFrog base URL and credentials"""
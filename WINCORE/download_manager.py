@@ -6,6 +6,8 @@ Handles artifact downloading with folder structure creation
 import os
 import requests
 import hashlib
+import shutil
+import time
 from pathlib import Path
 from typing import Optional, Tuple
 import logging
@@ -19,16 +21,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bytes read from the network per iteration while downloading
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Buffer in front of the downloaded file, so the disk sees a few large writes
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Block size for checksum reads on Python versions without hashlib.file_digest
+HASH_READ_SIZE = 1024 * 1024
+
+# Downloads at least this large get their full size allocated up front
+PREALLOCATE_MIN_BYTES = 64 * 1024 * 1024
+
+# Log download progress at most once per second
+PROGRESS_LOG_INTERVAL = 1.0
+
+# Checksum recorded for downloads. Always SHA-256, so stored values match
+# JFrog's published checksums and can be compared between hosts
+CHECKSUM_ALGORITHM = 'sha256'
+
+
+def new_hash(algorithm: str = CHECKSUM_ALGORITHM):
+    """Hash object for algorithm (any hashlib name)"""
+    return hashlib.new(algorithm)
+
+
+class ProgressReader:
+    """
+    Wraps a response stream for shutil.copyfileobj: every block read is
+    also hashed (CHECKSUM_ALGORITHM) and counted for progress logging
+    """
+
+    def __init__(self, raw, total_size: int):
+        self.raw = raw
+        self.total_size = total_size
+        self.hash_obj = new_hash()
+        self.downloaded = 0
+        self.next_log = time.monotonic() + PROGRESS_LOG_INTERVAL
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        if data:
+            self.hash_obj.update(data)
+            self.downloaded += len(data)
+
+            # Log progress at most once per second; formatting is left to logging
+            now = time.monotonic()
+            if now >= self.next_log:
+                self.next_log = now + PROGRESS_LOG_INTERVAL
+                logger.info("Download progress: %.1f%%",
+                            self.downloaded * 100.0 / self.total_size if self.total_size > 0 else 0)
+        return data
+
 
 class DownloadManager:
     """Manages artifact downloads and folder structure"""
 
-    def __init__(self, db_helper: DatabaseHelper, jfrog_config: JFrogConfig):
+    def __init__(self, db_helper: DatabaseHelper, jfrog_config: JFrogConfig,
+                 download_chunk_size: int = DOWNLOAD_CHUNK_SIZE):
         """Initialize with database helper and JFrog config"""
         self.db = db_helper
         self.jfrog = jfrog_config
         self.base_drive = self.db.get_base_drive()
         self.download_timeout = 600  # 10 minutes
+        self.download_chunk_size = download_chunk_size
+        # component_guid -> (source_folder, artifact_folder) already created
+        self._folder_cache = {}
 
     def create_folder_structure(self, component_guid: str) -> Tuple[str, str]:
         """
@@ -38,7 +96,13 @@ class DownloadManager:
         Structure:
         BaseDrive:/WINCORE/{ComponentGUID}/s/  (source/download folder)
         BaseDrive:/WINCORE/{ComponentGUID}/a/  (artifact/extraction folder)
+
+        Folders are only created the first time a component is seen
         """
+        folders = self._folder_cache.get(component_guid)
+        if folders:
+            return folders
+
         try:
             # Create base component folder
             component_base = os.path.join(self.base_drive, str(component_guid))
@@ -55,6 +119,7 @@ class DownloadManager:
             logger.debug(f"Source folder: {source_folder}")
             logger.debug(f"Artifact folder: {artifact_folder}")
 
+            self._folder_cache[component_guid] = (source_folder, artifact_folder)
             return source_folder, artifact_folder
 
         except Exception as e:
@@ -67,6 +132,18 @@ class DownloadManager:
         Download artifact from JFrog URL
         Returns: download_path or None if failed
         """
+        download_path, _, _ = self.download_artifact_with_checksum(
+            url, component_guid, component_name, build_date, build_number
+        )
+        return download_path
+
+    def download_artifact_with_checksum(self, url: str, component_guid: str, component_name: str,
+                                        build_date: str, build_number: int) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        Download artifact from JFrog URL, hashing it (CHECKSUM_ALGORITHM) while it is written
+        so the file does not have to be read back for its checksum or size
+        Returns: (download_path, checksum, downloaded_bytes) or (None, None, 0) if failed
+        """
         try:
             # Create folder structure
             source_folder, artifact_folder = self.create_folder_structure(component_guid)
@@ -83,50 +160,79 @@ class DownloadManager:
                 self.jfrog.create_session()
 
             # Download with streaming for large files
-            response = self.jfrog.session.get(url, stream=True, timeout=self.download_timeout)
+            # Zips are already compressed, so ask for the bytes as stored
+            response = self.jfrog.session.get(url, stream=True, timeout=self.download_timeout,
+                                              headers={'Accept-Encoding': 'identity'})
 
             if response.status_code == 200:
                 # Get file size
                 file_size = int(response.headers.get('Content-Length', 0))
 
-                # Download and save file
-                with open(download_path, 'wb') as file:
-                    downloaded = 0
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            file.write(chunk)
-                            downloaded += len(chunk)
+                # Download and save file in download_chunk_size blocks (copyfileobj is a
+                # plain read/write loop; the source is a socket, so no sendfile fast path)
+                response.raw.decode_content = True
+                reader = ProgressReader(response.raw, file_size)
+                with open(download_path, 'wb', buffering=WRITE_BUFFER_SIZE) as file:
+                    if file_size >= PREALLOCATE_MIN_BYTES:
+                        self.preallocate(file, file_size)
+
+                    shutil.copyfileobj(reader, file, self.download_chunk_size)
+                    if reader.downloaded < file_size:
+                        # Short download: drop the unwritten preallocated tail
+                        file.truncate()
+
+                    # Make sure the zip is on disk before it is recorded as downloaded
+                    file.flush()
+                    os.fsync(file.fileno())
 
-                            # Log progress every 10MB
-                            if downloaded % (10 * 1024 * 1024) == 0:
-                                progress = (downloaded / file_size * 100) if file_size > 0 else 0
-                                logger.info(f"Download progress: {progress:.1f}%")
+                # Byte count from the copy loop, checked against Content-Length
+                if not self.verify_download(download_path, file_size, reader.downloaded):
+                    return None, None, 0
 
                 logger.info(f"Download completed: {download_path}")
-                logger.info(f"File size: {file_size} bytes")
+                logger.info(f"File size: {reader.downloaded} bytes")
 
-                return download_path
+                return download_path, reader.hash_obj.hexdigest(), reader.downloaded
 
             else:
                 logger.error(f"Download failed with status code: {response.status_code}")
-                return None
+                return None, None, 0
 
         except requests.exceptions.Timeout:
             logger.error("Download timeout exceeded")
-            return None
+            return None, None, 0
 
         except Exception as e:
             logger.error(f"Download failed: {str(e)}")
-            return None
+            return None, None, 0
 
-    def calculate_checksum(self, file_path: str, algorithm: str = 'sha256') -> Optional[str]:
-        """Calculate file checksum"""
+    def preallocate(self, file, size: int):
+        """
+        Reserve the file's full size before writing, so the file system can lay
+        it out in one piece instead of growing it write by write
+        """
         try:
-            hash_obj = hashlib.new(algorithm)
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(file.fileno(), 0, size)
+            else:
+                # Windows: sets the end of file (SetEndOfFile); position stays at 0
+                file.truncate(size)
+        except OSError as e:
+            logger.debug(f"Preallocation skipped: {str(e)}")
 
+    def calculate_checksum(self, file_path: str, algorithm: str = CHECKSUM_ALGORITHM) -> Optional[str]:
+        """
+        Calculate file checksum (SHA-256 by default, as stored and published by JFrog)
+        """
+        try:
             with open(file_path, 'rb') as file:
-                for chunk in iter(lambda: file.read(8192), b''):
-                    hash_obj.update(chunk)
+                if hasattr(hashlib, 'file_digest'):
+                    # Python 3.11+: reads into one reused buffer instead of a new bytes per block
+                    hash_obj = hashlib.file_digest(file, algorithm)
+                else:
+                    hash_obj = hashlib.new(algorithm)
+                    for chunk in iter(lambda: file.read(HASH_READ_SIZE), b''):
+                        hash_obj.update(chunk)
 
             checksum = hash_obj.hexdigest()
             logger.debug(f"Checksum ({algorithm}): {checksum}")
@@ -136,14 +242,20 @@ class DownloadManager:
             logger.error(f"Checksum calculation failed: {str(e)}")
             return None
 
-    def verify_download(self, file_path: str, expected_size: int = None) -> bool:
-        """Verify downloaded file"""
+    def verify_download(self, file_path: str, expected_size: int = None,
+                        actual_size: int = None) -> bool:
+        """
+        Verify downloaded file
+        actual_size is the byte count seen while downloading; when given the
+        file is not stat'ed again
+        """
         try:
-            if not os.path.exists(file_path):
-                logger.error(f"File does not exist: {file_path}")
-                return False
+            if actual_size is None:
+                if not os.path.exists(file_path):
+                    logger.error(f"File does not exist: {file_path}")
+                    return False
 
-            actual_size = os.path.getsize(file_path)
+                actual_size = os.path.getsize(file_path)
 
             if expected_size and actual_size != expected_size:
                 logger.error(f"File size mismatch. Expected: {expected_size}, Actual: {actual_size}")
@@ -158,14 +270,14 @@ class DownloadManager:
 
     def download_and_track(self, component_id: int, branch_id: int, component_guid: str,
                           component_name: str, url: str, build_date: str,
-                          build_number: int) -> Tuple[bool, Optional[str]]:
+                          build_number: int) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Download artifact and update tracking in database
-        Returns: (success, download_path)
+        Returns: (success, download_path, checksum)
         """
         try:
-            # Download artifact
-            download_path = self.download_artifact(
+            # Download artifact (checksum and size are taken during the download)
+            download_path, checksum, file_size = self.download_artifact_with_checksum(
                 url, component_guid, component_name, build_date, build_number
             )
 
@@ -181,38 +293,25 @@ class DownloadManager:
                     """,
                     (component_id, branch_id)
                 )
-                return False, None
-
-            # Get file size and checksum
-            file_size = os.path.getsize(download_path)
-            checksum = self.calculate_checksum(download_path)
+                return False, None, None
 
-            # Update tracking with download info
+            # Update tracking with download info and log the activity in one batch
             success = self.db.update_download_status(
-                component_id, branch_id, download_path, file_size, checksum
+                component_id, branch_id, download_path, file_size, checksum,
+                log_message=f'Downloaded artifact: {component_name}',
+                build_date=build_date, build_number=build_number
             )
 
             if success:
-                # Log activity
-                self.db.log_polling_activity(
-                    log_level='INFO',
-                    log_message=f'Downloaded artifact: {component_name}',
-                    component_id=component_id,
-                    branch_id=branch_id,
-                    build_date=build_date,
-                    build_number=build_number,
-                    operation_type='download'
-                )
-
                 logger.info(f"Download tracked successfully for component {component_id}")
-                return True, download_path
+                return True, download_path, checksum
             else:
                 logger.error("Failed to update download tracking")
-                return False, download_path
+                return False, download_path, checksum
 
         except Exception as e:
             logger.error(f"Download and track failed: {str(e)}")
-            return False, None
+            return False, None, None
 
     def get_artifact_folder(self, component_guid: str) -> str:
         """Get artifact folder path for a component"""
@@ -6,8 +6,11 @@ Handles .zip file extraction to artifact folders
 import os
 import zipfile
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
 import logging
 from db_helper import DatabaseHelper
 
@@ -18,6 +21,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Threads extracting one archive (zlib releases the GIL while inflating)
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Written next to an extraction folder ({componentName}.artifact_hash):
+# checksum of the zip it came from. Kept outside the folder so it is not
+# harvested into the MSI
+ARTIFACT_HASH_SUFFIX = '.artifact_hash'
+
+# Read buffer for the archive while extracting
+ZIP_READ_BUFFER_SIZE = 1024 * 1024
+
+# Log extraction progress at most once per second
+PROGRESS_LOG_INTERVAL = 1.0
+
+# Smaller archives are extracted with a single extractall call, without
+# worker threads or progress logging
+PARALLEL_EXTRACT_MIN_FILES = 500
+
 
 class ExtractionManager:
     """Manages artifact extraction"""
@@ -37,45 +58,77 @@ class ExtractionManager:
                 logger.error(f"Zip file not found: {zip_path}")
                 return False
 
-            # Verify it's a valid zip file
-            if not zipfile.is_zipfile(zip_path):
-                logger.error(f"Invalid zip file: {zip_path}")
-                return False
-
-            # Create extraction directory if it doesn't exist
-            os.makedirs(extraction_path, exist_ok=True)
-
             logger.info(f"Extracting: {zip_path}")
             logger.info(f"Destination: {extraction_path}")
 
-            # Extract all files
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # Get total file count
-                file_count = len(zip_ref.namelist())
-                logger.info(f"Total files in archive: {file_count}")
+            # Get total file count
+            with open(zip_path, 'rb', buffering=ZIP_READ_BUFFER_SIZE) as zip_file, \
+                    zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                # Create extraction directory once the archive opened as a zip
+                os.makedirs(extraction_path, exist_ok=True)
 
-                # Extract with progress logging
-                extracted_count = 0
-                for file in zip_ref.namelist():
-                    zip_ref.extract(file, extraction_path)
-                    extracted_count += 1
-
-                    # Log progress every 100 files
-                    if extracted_count % 100 == 0:
-                        progress = (extracted_count / file_count * 100) if file_count > 0 else 0
-                        logger.info(f"Extraction progress: {progress:.1f}%")
+                names = zip_ref.namelist()
+                file_count = len(names)
+                logger.info(f"Total files in archive: {file_count}")
 
-            logger.info(f"Extraction completed: {extracted_count} files extracted")
+                # Small archive: one call does it all
+                if file_count < PARALLEL_EXTRACT_MIN_FILES:
+                    zip_ref.extractall(extraction_path)
+                    logger.info(f"Extraction completed: {file_count} files extracted")
+                    return True
+
+            # Extract in parallel; each worker takes every Nth entry
+            workers = max(1, min(EXTRACT_WORKERS, file_count))
+            progress = {'extracted': 0, 'lock': threading.Lock(),
+                        'next_log': time.monotonic() + PROGRESS_LOG_INTERVAL}
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self.extract_members, zip_path, names[i::workers],
+                                    extraction_path, file_count, progress)
+                    for i in range(workers)
+                ]
+                for future in futures:
+                    future.result()
+
+            logger.info(f"Extraction completed: {progress['extracted']} files extracted")
             return True
 
         except zipfile.BadZipFile:
-            logger.error(f"Corrupted zip file: {zip_path}")
+            # Raised by ZipFile itself for anything that is not a valid zip
+            logger.error(f"Invalid zip file: {zip_path}")
             return False
 
         except Exception as e:
             logger.error(f"Extraction failed: {str(e)}")
             return False
 
+    def extract_members(self, zip_path: str, names: list, extraction_path: str,
+                        file_count: int, progress: dict):
+        """Extract some entries of an archive (one worker's share)"""
+        # A ZipFile object is not thread-safe, so each worker opens its own.
+        # A large read buffer turns zipfile's small reads into few syscalls
+        with open(zip_path, 'rb', buffering=ZIP_READ_BUFFER_SIZE) as zip_file, \
+                zipfile.ZipFile(zip_file, 'r') as zip_ref:
+            for name in names:
+                try:
+                    zip_ref.extract(name, extraction_path)
+                except FileExistsError:
+                    # Another worker created the same parent folder first
+                    zip_ref.extract(name, extraction_path)
+
+                now = time.monotonic()
+                with progress['lock']:
+                    progress['extracted'] += 1
+                    extracted_count = progress['extracted']
+                    log_now = now >= progress['next_log']
+                    if log_now:
+                        progress['next_log'] = now + PROGRESS_LOG_INTERVAL
+
+                # Log progress at most once per second
+                if log_now:
+                    logger.info("Extraction progress: %.1f%%",
+                                extracted_count * 100.0 / file_count if file_count > 0 else 0)
+
     def verify_extraction(self, extraction_path: str) -> bool:
         """Verify extraction was successful"""
         try:
@@ -97,12 +150,16 @@ class ExtractionManager:
             return False
 
     def extract_artifact(self, component_id: int, branch_id: int, component_guid: str,
-                        component_name: str, zip_path: str) -> Tuple[bool, Optional[str]]:
+                        component_name: str, zip_path: str,
+                        expected_checksum: str = None) -> Tuple[bool, Optional[str]]:
         """
         Extract artifact and update tracking
         Returns: (success, extraction_path)
 
         Extraction path format: BaseDrive:/WINCORE/{ComponentGUID}/a/{componentName}/
+
+        When expected_checksum (the zip's download checksum) is given, it is stored next
+        to the extraction folder; extracting the same zip again is then skipped
         """
         try:
             # Build extraction path
@@ -114,7 +171,18 @@ class ExtractionManager:
                 component_name
             )
 
-            # Remove existing extraction if present
+            # Same zip already extracted here: nothing to do on disk
+            if (expected_checksum and os.path.isdir(extraction_path)
+                    and self.read_artifact_hash(extraction_path) == expected_checksum):
+                logger.info(f"Artifact already extracted: {extraction_path}")
+                success = self.db.update_extraction_status(
+                    component_id, branch_id, extraction_path,
+                    log_message=f'Extracted artifact: {component_name} (unchanged)'
+                )
+                return success, extraction_path
+
+            # Remove existing extraction (and its hash) if present
+            self.remove_artifact_hash(extraction_path)
             if os.path.exists(extraction_path):
                 logger.info(f"Removing existing extraction: {extraction_path}")
                 shutil.rmtree(extraction_path)
@@ -141,21 +209,16 @@ class ExtractionManager:
                 logger.error("Extraction verification failed")
                 return False, extraction_path
 
-            # Update tracking with extraction info
+            if expected_checksum:
+                self.write_artifact_hash(extraction_path, expected_checksum)
+
+            # Update tracking with extraction info and log the activity in one batch
             success = self.db.update_extraction_status(
-                component_id, branch_id, extraction_path
+                component_id, branch_id, extraction_path,
+                log_message=f'Extracted artifact: {component_name}'
             )
 
             if success:
-                # Log activity
-                self.db.log_polling_activity(
-                    log_level='INFO',
-                    log_message=f'Extracted artifact: {component_name}',
-                    component_id=component_id,
-                    branch_id=branch_id,
-                    operation_type='extraction'
-                )
-
                 logger.info(f"Extraction tracked successfully for component {component_id}")
                 return True, extraction_path
             else:
@@ -166,19 +229,54 @@ class ExtractionManager:
             logger.error(f"Extract artifact failed: {str(e)}")
             return False, None
 
-    def get_extracted_files(self, extraction_path: str) -> list:
-        """Get list of extracted files"""
+    def get_artifact_hash_path(self, extraction_path: str) -> str:
+        """Hash file beside the extraction folder: a/{componentName}.artifact_hash"""
+        return os.path.normpath(extraction_path) + ARTIFACT_HASH_SUFFIX
+
+    def read_artifact_hash(self, extraction_path: str) -> Optional[str]:
+        """Checksum of the zip last extracted into this folder, if recorded"""
         try:
-            if not os.path.exists(extraction_path):
-                return []
+            with open(self.get_artifact_hash_path(extraction_path), 'r') as hash_file:
+                return hash_file.read().strip()
+        except OSError:
+            return None
 
-            files = []
-            for root, dirs, filenames in os.walk(extraction_path):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    files.append(file_path)
+    def write_artifact_hash(self, extraction_path: str, checksum: str):
+        """Record the checksum of the zip extracted into this folder"""
+        try:
+            with open(self.get_artifact_hash_path(extraction_path), 'w') as hash_file:
+                hash_file.write(checksum)
+        except OSError as e:
+            logger.warning(f"Could not record artifact hash: {str(e)}")
 
-            return files
+    def remove_artifact_hash(self, extraction_path: str):
+        """Forget the recorded checksum (before the folder is replaced)"""
+        try:
+            os.remove(self.get_artifact_hash_path(extraction_path))
+        except OSError:
+            pass
+
+    def scan_extraction(self, extraction_path: str) -> Iterator[os.DirEntry]:
+        """
+        Yield a DirEntry for every file under the extraction path (one walk,
+        symlinks not followed); entry.stat() is cached on the entry
+        """
+        if not os.path.isdir(extraction_path):
+            return
+
+        stack = [extraction_path]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+
+    def get_extracted_files(self, extraction_path: str) -> list:
+        """Get list of extracted files"""
+        try:
+            return [entry.path for entry in self.scan_extraction(extraction_path)]
 
         except Exception as e:
             logger.error(f"Failed to get extracted files: {str(e)}")
@@ -187,15 +285,26 @@ class ExtractionManager:
     def get_extraction_size(self, extraction_path: str) -> int:
         """Calculate total size of extracted files"""
         try:
-            total_size = 0
-            for root, dirs, files in os.walk(extraction_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if os.path.exists(file_path):
-                        total_size += os.path.getsize(file_path)
-
-            return total_size
+            return sum(entry.stat(follow_symlinks=False).st_size
+                       for entry in self.scan_extraction(extraction_path))
 
         except Exception as e:
             logger.error(f"Failed to calculate extraction size: {str(e)}")
             return 0
+
+    def get_extraction_contents(self, extraction_path: str) -> Tuple[list, int]:
+        """
+        Get list of extracted files and their total size in a single walk
+        Returns: (files, total_size)
+        """
+        try:
+            files = []
+            total_size = 0
+            for entry in self.scan_extraction(extraction_path):
+                files.append(entry.path)
+                total_size += entry.stat(follow_symlinks=False).st_size
+            return files, total_size
+
+        except Exception as e:
+            logger.error(f"Failed to scan extraction: {str(e)}")
+            return [], 0
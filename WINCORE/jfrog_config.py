@@ -3,8 +3,12 @@ JFrog Configuration Management Module
 Handles JFrog credentials, URL construction, and authentication
 """
 
+import re
 import requests
-from typing import Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from datetime import datetime
 import logging
 from db_helper import DatabaseHelper
@@ -17,6 +21,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Stop probing after this many missing builds in a row, or past this build number
+MAX_CONSECUTIVE_MISSES = 10
+MAX_BUILD_NUMBER = 1000
+
+# Parallel HEAD probes per find_latest_build scan. A window is also never
+# wider than the remaining miss budget, so no more builds are probed than
+# a one-by-one scan would check
+PROBE_WORKERS = 8
+
+# (connect, read) timeout for a build probe; a HEAD answer is small and a
+# probe that hangs holds up its whole window
+PROBE_TIMEOUT = (3, 5)
+
+# Connection pool for the JFrog session; large enough for a full probe burst
+# plus the polling threads' downloads
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+
+# Entries of a storage listing: /Build{date}.{buildNumber}/{file}
+BUILD_FILE_PATTERN = re.compile(r'^/Build(\d{8})\.(\d+)/([^/]+)$')
+
 
 class JFrogConfig:
     """JFrog configuration and credential management"""
@@ -55,13 +80,31 @@ class JFrogConfig:
             logger.error(f"Failed to load JFrog configuration: {str(e)}")
             return False
 
-    def create_session(self) -> bool:
-        """Create authenticated requests session"""
+    def create_session(self, pool_maxsize: int = POOL_MAXSIZE) -> bool:
+        """
+        Create authenticated requests session
+        pool_maxsize is the number of keep-alive connections kept to JFrog;
+        it should cover every thread that downloads at the same time
+        """
         try:
             self.session = requests.Session()
             self.session.auth = (self.username, self.password)
+
+            # Keep connections alive and retry throttling and brief server errors.
+            # pool_block=False: a burst beyond pool_maxsize opens extra
+            # connections instead of waiting for a free one
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize,
+                pool_block=False,
+                max_retries=Retry(total=3, backoff_factor=0.3,
+                                  status_forcelist=[429, 500, 502, 503, 504])
+            )
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
             self.session.headers.update({
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Connection': 'keep-alive'
             })
             logger.info("JFrog session created successfully")
             return True
@@ -100,15 +143,18 @@ class JFrogConfig:
         Build JFrog artifact URL
         Format: https://{JFROGBaseURL}/{ProjectShortKey}/{ComponentGUID}/{branch}/Build{date}.{buildNumber}/{componentName}.zip
         """
-        url = (
-            f"{self.base_url}/"
-            f"{project_key}/"
-            f"{component_guid}/"
-            f"{branch}/"
-            f"Build{build_date}.{build_number}/"
-            f"{component_name}.zip"
-        )
-        return url
+        prefix, suffix = self.artifact_url_parts(project_key, component_guid, branch, component_name)
+        return f"{prefix}Build{build_date}.{build_number}{suffix}"
+
+    def artifact_url_parts(self, project_key: str, component_guid: str,
+                           branch: str, component_name: str) -> Tuple[str, str]:
+        """
+        The fixed parts of an artifact URL around Build{date}.{buildNumber}
+        Returns: (prefix, suffix)
+        """
+        prefix = f"{self.base_url}/{project_key}/{component_guid}/{branch}/"
+        suffix = f"/{component_name}.zip"
+        return prefix, suffix
 
     def check_artifact_exists(self, url: str) -> bool:
         """Check if artifact exists at given URL"""
@@ -116,7 +162,8 @@ class JFrogConfig:
             if not self.session:
                 self.create_session()
 
-            response = self.session.head(url, timeout=10)
+            # Only the status matters, so a redirect to storage is not followed
+            response = self.session.head(url, allow_redirects=False, timeout=PROBE_TIMEOUT)
 
             if response.status_code == 200:
                 logger.debug(f"Artifact found: {url}")
@@ -136,38 +183,88 @@ class JFrogConfig:
                          branch: str, component_name: str,
                          start_date: str = None, start_build: int = 1) -> Optional[Tuple[str, int]]:
         """
-        Find the latest available build by incrementing build numbers
+        Find the latest available build
+        Uses the storage listing (list_builds) when available; otherwise
+        build numbers are checked a window at a time with parallel HEAD
+        requests (at most PROBE_WORKERS, and no more than the misses still
+        allowed), then walked in order exactly like a one-by-one scan
         Returns: (build_date, build_number) or None
         """
         if not start_date:
             start_date = datetime.now().strftime('%Y%m%d')
 
+        if not self.session:
+            self.create_session()
+
         current_date = start_date
         current_build = start_build
         latest_found = None
         consecutive_misses = 0
-        max_consecutive_misses = 10  # Stop after 10 consecutive misses
 
-        # Try incrementing build numbers
-        while consecutive_misses < max_consecutive_misses and current_build <= 1000:
-            url = self.build_artifact_url(
-                project_key, component_guid, branch,
-                current_date, current_build, component_name
-            )
-
-            if self.check_artifact_exists(url):
-                latest_found = (current_date, current_build)
-                consecutive_misses = 0
-                current_build += 1
-            else:
-                consecutive_misses += 1
-                current_build += 1
+        # One listing call is enough when the storage API is available
+        builds = self.list_builds(project_key, component_guid, branch, component_name)
+        if builds is not None:
+            build_numbers = [number for date, number in builds
+                             if date == current_date and number >= start_build]
+            if build_numbers:
+                latest_found = (current_date, max(build_numbers))
+                logger.info(f"Latest build found: Build{latest_found[0]}.{latest_found[1]}")
+            return latest_found
+
+        # Otherwise try incrementing build numbers; only the number changes per URL
+        url_prefix, url_suffix = self.artifact_url_parts(project_key, component_guid, branch, component_name)
+        build_name = f"Build{current_date}."
+        with ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix='jfrog-probe') as executor:
+            while consecutive_misses < MAX_CONSECUTIVE_MISSES and current_build <= MAX_BUILD_NUMBER:
+                window_size = min(PROBE_WORKERS, MAX_CONSECUTIVE_MISSES - consecutive_misses)
+                window = range(current_build, min(current_build + window_size, MAX_BUILD_NUMBER + 1))
+                urls = [f"{url_prefix}{build_name}{build_number}{url_suffix}" for build_number in window]
+                found = executor.map(self.check_artifact_exists, urls)
+
+                for build_number, exists in zip(window, found):
+                    if exists:
+                        latest_found = (current_date, build_number)
+                        consecutive_misses = 0
+                    else:
+                        consecutive_misses += 1
+
+                current_build = window.stop
 
         if latest_found:
             logger.info(f"Latest build found: Build{latest_found[0]}.{latest_found[1]}")
 
         return latest_found
 
+    def list_builds(self, project_key: str, component_guid: str, branch: str,
+                    component_name: str) -> Optional[List[Tuple[str, int]]]:
+        """
+        List builds of a branch with one Artifactory storage API call
+        Only builds whose folder holds {componentName}.zip are returned
+        Returns: [(build_date, build_number), ...] or None if the listing is unavailable
+        """
+        try:
+            if not self.session:
+                self.create_session()
+
+            list_url = f"{self.base_url}/api/storage/{project_key}/{component_guid}/{branch}"
+            response = self.session.get(list_url, params='list&deep=1&depth=2', timeout=30)
+
+            if response.status_code != 200:
+                logger.debug(f"Build listing unavailable ({response.status_code}): {list_url}")
+                return None
+
+            artifact_name = f"{component_name}.zip"
+            builds = []
+            for entry in response.json().get('files', []):
+                match = BUILD_FILE_PATTERN.match(entry.get('uri', ''))
+                if match and match.group(3) == artifact_name:
+                    builds.append((match.group(1), int(match.group(2))))
+            return builds
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.debug(f"Build listing failed: {str(e)}")
+            return None
+
     def get_artifact_info(self, url: str) -> Optional[dict]:
         """Get artifact metadata"""
         try:
@@ -12,23 +12,38 @@ Usage:
 """
 
 import sys
+import atexit
+import queue
+import signal
 import argparse
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from db_helper import DatabaseHelper
 from jfrog_config import JFrogConfig
-from polling_engine import PollingEngine
+from polling_engine import PollingEngine, summarize_results
 from cleanup_manager import CleanupManager
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'jfrog_polling_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
-)
+# Polling threads only put records on a queue; one listener thread formats
+# them and writes the file and console output
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+file_handler = logging.FileHandler(f'jfrog_polling_{datetime.now().strftime("%Y%m%d")}.log')
+file_handler.setFormatter(log_formatter)
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+# Replaces the console handler the imported modules' basicConfig installed
+root_logger.handlers = [QueueHandler(log_queue)]
+
+log_listener = QueueListener(log_queue, file_handler, console_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,6 +75,13 @@ class JFrogPollingOrchestrator:
         self.polling_engine = PollingEngine(self.db)
         self.cleanup_manager = CleanupManager(self.db)
 
+        # The engine keeps its thread pool between cycles; release it on exit
+        atexit.register(self.polling_engine.shutdown)
+
+        # Configuration is cached; SIGHUP (POSIX only) makes it re-read
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.polling_engine.invalidate_config_cache())
+
         logger.info("System components initialized")
 
     def test_connection(self):
@@ -153,9 +175,10 @@ class JFrogPollingOrchestrator:
         self.polling_engine.stop()
 
         # Display results summary
-        successful = sum(1 for r in results if r.get('success'))
-        new_builds = sum(1 for r in results if r.get('new_build'))
-        failed = sum(1 for r in results if not r.get('success'))
+        counts = summarize_results(results)
+        successful = counts['successful']
+        new_builds = counts['new_builds']
+        failed = counts['failed']
 
         summary = f"""
         Poll Cycle Summary:
@@ -216,9 +239,9 @@ class JFrogPollingOrchestrator:
             summary = f"""
             Cleanup Summary:
             - Components Processed: {result['components_processed']}
-            - Total Items Deleted: {result['total_deleted']}
+            - Total Items Deleted or Queued: {result['total_deleted']}
             - Total Items Failed: {result['total_failed']}
-            - Space Freed: {result['total_space_freed'] / (1024*1024):.2f} MB
+            - Space To Be Freed: {result['total_space_freed'] / (1024*1024):.2f} MB
             """
             print(summary)
             logger.info(summary)
@@ -20,6 +20,7 @@
 --  - sp_GetActivePollingConfig
 --  - sp_UpdateBuildTracking
 --  - sp_CleanupOldBuilds
+--  - sp_CleanupOldBuildsBulk
 --  - sp_LogPollingActivity
 --============================================================
 
@@ -154,12 +155,33 @@ BEGIN
     );
 
     CREATE INDEX IX_polling_log_date ON jfrog_polling_log(log_date DESC);
-    CREATE INDEX IX_polling_log_level ON jfrog_polling_log(log_level);
+    -- /logs filtered by level: newest first (log_id DESC), paged on log_id < ?
+    CREATE INDEX IX_polling_log_level_id ON jfrog_polling_log(log_level, log_id DESC);
     CREATE INDEX IX_polling_log_component_branch ON jfrog_polling_log(component_id, branch_id);
     CREATE INDEX IX_polling_log_thread ON jfrog_polling_log(thread_id);
 END
 GO
 
+-- Upgrade indexes on databases created before IX_polling_log_level_id
+IF EXISTS (SELECT * FROM sys.index_columns ic
+           INNER JOIN sys.indexes i ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+           WHERE i.name = 'IX_polling_log_date' AND ic.object_id = OBJECT_ID('jfrog_polling_log')
+               AND ic.is_included_column = 1)
+BEGIN
+    DROP INDEX IX_polling_log_date ON jfrog_polling_log;
+    CREATE INDEX IX_polling_log_date ON jfrog_polling_log(log_date DESC);
+END
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_polling_log_level' AND object_id = OBJECT_ID('jfrog_polling_log'))
+    DROP INDEX IX_polling_log_level ON jfrog_polling_log;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_polling_log_level_date' AND object_id = OBJECT_ID('jfrog_polling_log'))
+    DROP INDEX IX_polling_log_level_date ON jfrog_polling_log;
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_polling_log_level_id' AND object_id = OBJECT_ID('jfrog_polling_log'))
+    CREATE INDEX IX_polling_log_level_id ON jfrog_polling_log(log_level, log_id DESC);
+GO
+
 -- ============================================================
 -- Table: jfrog_system_config
 -- Description: System-wide configuration for JFrog polling
@@ -297,7 +319,6 @@ AS
 BEGIN
     SET NOCOUNT ON;
 
-    -- Mark old builds as deleted
     WITH RankedBuilds AS (
         SELECT
             history_id,
@@ -307,24 +328,61 @@ BEGIN
             AND branch_id = @branch_id
             AND is_deleted = 0
     )
-    UPDATE jfrog_build_history
+    -- Mark old builds as deleted and return them for removal from disk
+    UPDATE bh
     SET is_deleted = 1,
         deleted_time = GETDATE()
-    WHERE history_id IN (
-        SELECT history_id
-        FROM RankedBuilds
-        WHERE rn > @max_builds_to_keep
-    );
+    OUTPUT
+        inserted.download_path,
+        inserted.extraction_path
+    FROM jfrog_build_history bh
+    INNER JOIN RankedBuilds rb ON bh.history_id = rb.history_id
+    WHERE rb.rn > @max_builds_to_keep;
+END
+GO
 
-    -- Return list of builds to delete from disk
-    SELECT
-        download_path,
-        extraction_path
-    FROM jfrog_build_history
-    WHERE component_id = @component_id
-        AND branch_id = @branch_id
-        AND is_deleted = 1
-        AND deleted_time >= DATEADD(MINUTE, -5, GETDATE());
+-- ============================================================
+-- Stored Procedure: Cleanup Old Builds For All Components
+-- Description: Same as sp_CleanupOldBuilds, but for every active
+--              component/branch in one call
+-- ============================================================
+IF EXISTS (SELECT * FROM sys.objects WHERE type = 'P' AND name = 'sp_CleanupOldBuildsBulk')
+    DROP PROCEDURE sp_CleanupOldBuildsBulk;
+GO
+
+CREATE PROCEDURE sp_CleanupOldBuildsBulk
+    @max_builds_to_keep INT = 5
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- Rank builds per component/branch, newest first
+    WITH RankedBuilds AS (
+        SELECT
+            bh.history_id,
+            ROW_NUMBER() OVER (
+                PARTITION BY bh.component_id, bh.branch_id
+                ORDER BY bh.build_date DESC, bh.build_number DESC
+            ) as rn
+        FROM jfrog_build_history bh
+        INNER JOIN components c ON bh.component_id = c.component_id
+        INNER JOIN component_branches cb ON bh.branch_id = cb.branch_id
+        WHERE c.is_enabled = 1
+            AND cb.is_active = 1
+            AND bh.is_deleted = 0
+    )
+    -- Mark old builds as deleted and return them for removal from disk
+    UPDATE bh
+    SET is_deleted = 1,
+        deleted_time = GETDATE()
+    OUTPUT
+        inserted.component_id,
+        inserted.branch_id,
+        inserted.download_path,
+        inserted.extraction_path
+    FROM jfrog_build_history bh
+    INNER JOIN RankedBuilds rb ON bh.history_id = rb.history_id
+    WHERE rb.rn > @max_builds_to_keep;
 END
 GO
 
@@ -368,5 +426,6 @@ PRINT 'Stored Procedures Created:';
 PRINT '  - sp_GetActivePollingConfig';
 PRINT '  - sp_UpdateBuildTracking';
 PRINT '  - sp_CleanupOldBuilds';
+PRINT '  - sp_CleanupOldBuildsBulk';
 PRINT '  - sp_LogPollingActivity';
 PRINT '============================================================';
@@ -17,6 +17,7 @@ class JFrogUrlBuilder:
 
     DEFAULT_PATTERN = "{ProjectShortKey}/{ComponentName}/{branch}/Build{date}.{buildNumber}/{componentName}.zip"
     DATE_FORMAT = "%Y%m%d"
+    INFO_CACHE_SECONDS = 300  # component info and branch patterns (5 min)
 
     def __init__(self, db_helper: DatabaseHelper, ssp_client: SSPClient):
         """Initialize with database helper and SSP client"""
@@ -25,6 +26,9 @@ class JFrogUrlBuilder:
         self._base_url = None
         self._credentials = None
         self._last_cred_fetch = None
+        # component_id -> (fetched, info); (component_id, branch) -> (fetched, pattern)
+        self._component_info_cache = {}
+        self._pattern_cache = {}
 
     def _get_jfrog_base_url(self) -> str:
         """Get JFrog base URL from system config"""
@@ -36,17 +40,39 @@ class JFrogUrlBuilder:
             self._base_url = base_url if base_url.endswith('/') else base_url + '/'
         return self._base_url
 
+    def _get_cached(self, cache: Dict, key, now: datetime):
+        """Value cached under key if fetched less than INFO_CACHE_SECONDS ago, else None"""
+        cached = cache.get(key)
+        if cached and (now - cached[0]).total_seconds() < self.INFO_CACHE_SECONDS:
+            return cached[1]
+        return None
+
     def _get_component_info(self, component_id: int) -> Dict:
-        """Get component and project information"""
+        """Get component and project information (cached for 5 min)"""
+        now = datetime.now()
+        info = self._get_cached(self._component_info_cache, component_id, now)
+        if info:
+            return info
+
         info = self.db.get_component_info(component_id)
         if not info:
             raise ValueError(f"Component {component_id} not found")
+        self._component_info_cache[component_id] = (now, info)
         return info
 
     def _get_pattern(self, component_id: int, branch: str) -> str:
-        """Get URL pattern for component/branch"""
+        """Get URL pattern for component/branch (cached for 5 min)"""
+        now = datetime.now()
+        pattern = self._get_cached(self._pattern_cache, (component_id, branch), now)
+        if pattern:
+            return pattern
+
         pattern = self.db.get_branch_pattern(component_id, branch)
-        return pattern if pattern else self.DEFAULT_PATTERN
+        if not pattern:
+            # No override, or the read failed (both give None): not cached
+            return self.DEFAULT_PATTERN
+        self._pattern_cache[(component_id, branch)] = (now, pattern)
+        return pattern
 
     def _get_build_number(self, component_id: int) -> int:
         """Get next build number for component"""
@@ -107,8 +133,8 @@ class JFrogUrlBuilder:
                 componentName=component_name.lower()
             )
             
-            # URL encode path segments
-            encoded_path = '/'.join(quote(part) for part in path.split('/'))
+            # URL encode path segments (the '/' separators are kept)
+            encoded_path = quote(path, safe='/')
             
             # Join with base URL
             base_url = self._get_jfrog_base_url()
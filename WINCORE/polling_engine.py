@@ -1,17 +1,20 @@
 """
 Multi-threaded Polling Engine
 Handles concurrent polling of JFrog artifacts across multiple components and branches
-Supports 10K+ concurrent threads with thread pool management
+The thread pool is sized to the number of component/branch configurations
 """
 
+import os
+import queue
 import threading
 import time
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Optional
 import logging
+from collections import deque
 from db_helper import DatabaseHelper
-from jfrog_config import JFrogConfig
+from jfrog_config import JFrogConfig, PROBE_WORKERS
 from download_manager import DownloadManager
 from extraction_manager import ExtractionManager
 from cleanup_manager import CleanupManager
@@ -23,6 +26,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Polling thread pool size: one thread per component/branch configuration
+# (the work is I/O-bound), kept between these bounds
+MIN_POLL_WORKERS = 8
+MAX_POLL_WORKERS = 512
+
+# Threads downloading and extracting new builds at the same time
+MAX_TRANSFER_WORKERS = 16
+
+# Buffered activity log entries are written once this many are queued, or
+# when the oldest unwritten entry is this many seconds old
+LOG_FLUSH_SIZE = 100
+LOG_FLUSH_INTERVAL_SECONDS = 5
+
+
+def summarize_results(results: List[Dict]) -> Dict[str, int]:
+    """Count successful, new-build and failed polls in one pass over the results"""
+    successful = new_builds = failed = 0
+    for result in results:
+        if result.get('success'):
+            successful += 1
+        else:
+            failed += 1
+        if result.get('new_build'):
+            new_builds += 1
+    return {'successful': successful, 'new_builds': new_builds, 'failed': failed}
+
 
 class PollingEngine:
     """Multi-threaded polling engine for JFrog artifacts"""
@@ -38,8 +67,19 @@ class PollingEngine:
         self.max_threads = self.db.get_max_threads()
         self.is_running = False
         self.executor = None
-        self.active_threads = {}
+        self.transfer_executor = None
+        self.pool_size = 0
+        # Polls (discovery or transfer) running right now; guarded by thread_lock
+        self.active_count = 0
         self.thread_lock = threading.Lock()
+        # (component_id, branch_id) -> time.monotonic() of the last poll that
+        # found nothing new; guarded by thread_lock
+        self._last_poll = {}
+        # Activity log entries of the current cycle; see buffer_log
+        self.log_buffer = deque()
+        self._last_log_flush = time.monotonic()
+        # Set by stop(); wakes run_continuous_polling between cycles
+        self._stop_event = threading.Event()
 
     def start(self):
         """Start the polling engine"""
@@ -49,9 +89,16 @@ class PollingEngine:
 
         logger.info(f"Starting polling engine with max {self.max_threads} threads")
         self.is_running = True
+        self._stop_event.clear()
+
+        config_count = len(self.db.get_active_polling_config())
+        pool_size = self.get_pool_size(config_count)
 
-        # Create JFrog session
-        self.jfrog.create_session()
+        # Create JFrog session; keep enough connections open for every polling
+        # and transfer thread plus the build probes
+        self.jfrog.create_session(
+            pool_maxsize=max(pool_size, self.pool_size) + MAX_TRANSFER_WORKERS + PROBE_WORKERS
+        )
 
         # Test JFrog connection
         success, message = self.jfrog.test_connection()
@@ -60,51 +107,115 @@ class PollingEngine:
             self.is_running = False
             return
 
-        # Initialize thread pool executor
-        self.executor = ThreadPoolExecutor(max_workers=self.max_threads)
+        # The thread pool is created on the first start and kept across
+        # start/stop, so its threads are only spawned once per process.
+        # It is only rebuilt if more configurations need a larger pool
+        if self.executor is None or pool_size > self.pool_size:
+            if self.executor:
+                self.executor.shutdown(wait=False)
+                self.transfer_executor.shutdown(wait=False)
+            self.executor = ThreadPoolExecutor(max_workers=pool_size,
+                                               thread_name_prefix='jfrog-poll')
+            # Downloads/extractions of new builds get their own, smaller pool
+            self.transfer_executor = ThreadPoolExecutor(
+                max_workers=min(MAX_TRANSFER_WORKERS, pool_size),
+                thread_name_prefix='jfrog-transfer'
+            )
+            self.pool_size = pool_size
+            logger.info(f"Polling thread pool: {pool_size} threads "
+                        f"(configured max {self.max_threads}, {config_count} configurations)")
+            self._prewarm(min(config_count, pool_size))
 
         logger.info("Polling engine started successfully")
 
+    def get_pool_size(self, config_count: int) -> int:
+        """Threads needed to poll config_count configurations, within MaxConcurrentThreads"""
+        return min(self.max_threads, max(MIN_POLL_WORKERS, min(MAX_POLL_WORKERS, config_count)))
+
+    def _prewarm(self, count: int):
+        """Spawn pool threads up front by running count no-op tasks"""
+        futures = [self.executor.submit(lambda: None) for _ in range(count)]
+        for future in as_completed(futures):
+            future.result()
+
     def stop(self):
-        """Stop the polling engine"""
+        """Stop the polling engine (the thread pool stays up for the next start)"""
         if not self.is_running:
             logger.warning("Polling engine is not running")
             return
 
         logger.info("Stopping polling engine...")
         self.is_running = False
+        self._stop_event.set()
+        self.flush_logs()
+
+        logger.info("Polling engine stopped")
+
+    def shutdown(self):
+        """Stop the engine and its thread pool (on process exit)"""
+        if self.is_running:
+            self.stop()
 
         if self.executor:
             self.executor.shutdown(wait=True)
+            self.transfer_executor.shutdown(wait=True)
+            self.executor = None
+            self.transfer_executor = None
             logger.info("Thread pool executor shutdown complete")
 
-        logger.info("Polling engine stopped")
+        # Entries added by transfers that finished after stop()
+        self.flush_logs()
 
     def poll_component_branch(self, config: Dict) -> Dict[str, any]:
         """
-        Poll a single component/branch for new builds
+        Poll a single component/branch for new builds, and download/extract
+        a new build on the calling thread
         Returns: Result dictionary with status and details
         """
+        result = self.discover_build(config)
+        if result.get('transfer'):
+            result = self.transfer_build(config, result)
+        self.flush_logs()
+        return result
+
+    def discover_build(self, config: Dict, respect_interval: bool = False) -> Dict[str, any]:
+        """
+        Discovery stage: look for a build newer than the tracked one
+        With respect_interval, a component/branch polled less than its
+        polling_interval_seconds ago is skipped without calling JFrog
+        Returns: the poll result, or {'transfer': True, ...} when a new build
+        must be downloaded (see transfer_build)
+        """
         component_id = config['component_id']
         branch_id = config['branch_id']
         component_guid = config['component_guid']
         component_name = config['component_name']
         project_key = config['project_key']
         branch_name = config['branch_name']
-        polling_interval = config.get('polling_interval_seconds', 300)
+        polling_interval = config.get('polling_interval_seconds') or 0
+        poll_key = (component_id, branch_id)
 
         start_time = time.time()
 
+        if respect_interval and polling_interval:
+            with self.thread_lock:
+                last_poll = self._last_poll.get(poll_key)
+            if last_poll is not None and time.monotonic() - last_poll < polling_interval:
+                result = self._no_new_build_result(component_id, branch_id, start_time)
+                result['skipped'] = True
+                return result
+
         try:
-            logger.info(f"Polling: {component_name} - {branch_name}")
+            logger.info("Polling: %s - %s", component_name, branch_name)
 
             # Get current build tracking
             current_tracking = self.db.get_build_tracking(component_id, branch_id)
 
             # Determine starting point for search
             if current_tracking:
-                start_date = current_tracking.get('latest_build_date')
-                start_build = current_tracking.get('latest_build_number', 1)
+                prev_date = current_tracking.get('latest_build_date')
+                prev_number = current_tracking.get('latest_build_number', 1)
+                start_date, start_build = prev_date, prev_number
             else:
                 start_date = datetime.now().strftime('%Y%m%d')
                 start_build = 1
@@ -115,42 +226,54 @@ class PollingEngine:
                 component_name, start_date, start_build
             )
 
-            if not latest_build:
-                logger.debug(f"No new builds found for {component_name} - {branch_name}")
-                duration_ms = int((time.time() - start_time) * 1000)
-                return {
-                    'success': True,
-                    'new_build': False,
-                    'component_id': component_id,
-                    'branch_id': branch_id,
-                    'duration_ms': duration_ms
-                }
+            # New only if nothing is tracked yet or it is past the tracked build
+            is_new_build = bool(latest_build) and (
+                not current_tracking or prev_date is None or
+                latest_build > (prev_date, prev_number or 0)
+            )
 
-            build_date, build_number = latest_build
+            if not is_new_build:
+                logger.debug("No new builds for %s - %s", component_name, branch_name)
+                with self.thread_lock:
+                    self._last_poll[poll_key] = time.monotonic()
+                return self._no_new_build_result(component_id, branch_id, start_time)
 
-            # Check if this is a new build
-            is_new_build = False
-            if not current_tracking:
-                is_new_build = True
-            elif (build_date > current_tracking.get('latest_build_date') or
-                  (build_date == current_tracking.get('latest_build_date') and
-                   build_number > current_tracking.get('latest_build_number'))):
-                is_new_build = True
+            # A component that just produced a build is looked at again next cycle
+            with self.thread_lock:
+                self._last_poll.pop(poll_key, None)
 
-            if not is_new_build:
-                logger.debug(f"No new builds for {component_name} - {branch_name}")
-                duration_ms = int((time.time() - start_time) * 1000)
-                return {
-                    'success': True,
-                    'new_build': False,
-                    'component_id': component_id,
-                    'branch_id': branch_id,
-                    'duration_ms': duration_ms
-                }
+            build_date, build_number = latest_build
 
             # New build found!
-            logger.info(f"New build found: {component_name} - Build{build_date}.{build_number}")
+            logger.info("New build found: %s - Build%s.%s", component_name, build_date, build_number)
+
+            return {
+                'transfer': True,
+                'build_date': build_date,
+                'build_number': build_number,
+                'start_time': start_time
+            }
+
+        except Exception as e:
+            return self._poll_failed_result(config, start_time, e)
+
+    def transfer_build(self, config: Dict, discovery: Dict) -> Dict[str, any]:
+        """
+        Transfer stage: download, extract, record and clean up a new build
+        found by discover_build
+        Returns: Result dictionary with status and details
+        """
+        component_id = config['component_id']
+        branch_id = config['branch_id']
+        component_guid = config['component_guid']
+        component_name = config['component_name']
+        project_key = config['project_key']
+        branch_name = config['branch_name']
+        build_date = discovery['build_date']
+        build_number = discovery['build_number']
+        start_time = discovery['start_time']
 
+        try:
             # Build download URL
             download_url = self.jfrog.build_artifact_url(
                 project_key, component_guid, branch_name,
@@ -164,7 +287,7 @@ class PollingEngine:
             )
 
             # Download artifact
-            download_success, download_path = self.download_mgr.download_and_track(
+            download_success, download_path, checksum = self.download_mgr.download_and_track(
                 component_id, branch_id, component_guid, component_name,
                 download_url, build_date, build_number
             )
@@ -184,7 +307,7 @@ class PollingEngine:
             # Extract artifact
             extract_success, extraction_path = self.extract_mgr.extract_artifact(
                 component_id, branch_id, component_guid,
-                component_name, download_path
+                component_name, download_path, expected_checksum=checksum
             )
 
             if not extract_success:
@@ -199,9 +322,10 @@ class PollingEngine:
                     'duration_ms': duration_ms
                 }
 
-            # Insert into build history
-            file_size = self.download_mgr.calculate_checksum(download_path) if download_path else 0
-            checksum = self.download_mgr.calculate_checksum(download_path)
+            # Insert into build history; checksum was taken during the download
+            file_size = os.path.getsize(download_path)
+
+            duration_ms = int((time.time() - start_time) * 1000)
 
             self.db.insert_build_history(
                 component_id, branch_id, build_date, build_number,
@@ -209,14 +333,8 @@ class PollingEngine:
                 file_size, checksum
             )
 
-            # Cleanup old builds
-            cleanup_result = self.cleanup_mgr.cleanup_old_builds(component_id, branch_id)
-            logger.info(f"Cleanup: {cleanup_result.get('deleted_count', 0)} items deleted")
-
-            duration_ms = int((time.time() - start_time) * 1000)
-
             # Log successful polling
-            self.db.log_polling_activity(
+            self.buffer_log(
                 log_level='INFO',
                 log_message=f'New build processed: Build{build_date}.{build_number}',
                 component_id=component_id,
@@ -227,7 +345,11 @@ class PollingEngine:
                 duration_ms=duration_ms
             )
 
-            logger.info(f"Polling completed successfully: {component_name} - Build{build_date}.{build_number}")
+            # Cleanup old builds
+            cleanup_result = self.cleanup_mgr.cleanup_old_builds(component_id, branch_id)
+            logger.info("Cleanup: %s items deleted", cleanup_result.get('deleted_count', 0))
+
+            logger.info("Polling completed successfully: %s - Build%s.%s", component_name, build_date, build_number)
 
             return {
                 'success': True,
@@ -242,31 +364,86 @@ class PollingEngine:
             }
 
         except Exception as e:
-            duration_ms = int((time.time() - start_time) * 1000)
-            logger.error(f"Polling failed for {component_name}: {str(e)}")
+            return self._poll_failed_result(config, start_time, e)
+
+    def _poll_failed_result(self, config: Dict, start_time: float, error: Exception) -> Dict[str, any]:
+        """Log a poll that raised, and return its result"""
+        duration_ms = int((time.time() - start_time) * 1000)
+        logger.error(f"Polling failed for {config['component_name']}: {str(error)}")
+
+        # Log error
+        self.buffer_log(
+            log_level='ERROR',
+            log_message=f'Polling failed: {str(error)}',
+            component_id=config['component_id'],
+            branch_id=config['branch_id'],
+            operation_type='poll',
+            duration_ms=duration_ms
+        )
 
-            # Log error
-            self.db.log_polling_activity(
-                log_level='ERROR',
-                log_message=f'Polling failed: {str(e)}',
-                component_id=component_id,
-                branch_id=branch_id,
-                operation_type='poll',
-                duration_ms=duration_ms
-            )
+        return {
+            'success': False,
+            'new_build': False,
+            'component_id': config['component_id'],
+            'branch_id': config['branch_id'],
+            'error': str(error),
+            'duration_ms': duration_ms
+        }
 
-            return {
-                'success': False,
-                'new_build': False,
-                'component_id': component_id,
-                'branch_id': branch_id,
-                'error': str(e),
-                'duration_ms': duration_ms
-            }
+    def _run_counted(self, func, *args):
+        """Run func(*args) on a pool thread, counted in active_count while it runs"""
+        with self.thread_lock:
+            self.active_count += 1
+        try:
+            return func(*args)
+        finally:
+            with self.thread_lock:
+                self.active_count -= 1
+
+    def buffer_log(self, log_level: str, log_message: str,
+                   component_id: int = None, branch_id: int = None,
+                   build_date: str = None, build_number: int = None,
+                   operation_type: str = None, duration_ms: int = None):
+        """
+        Queue a polling activity log entry (same arguments as log_polling_activity)
+        Entries are written in batches by flush_logs(): every LOG_FLUSH_SIZE
+        entries or LOG_FLUSH_INTERVAL_SECONDS, at the end of a cycle, and
+        straight away once the engine is stopped
+        """
+        self.log_buffer.append((None, component_id, branch_id, log_level, log_message,
+                                build_date, build_number, operation_type, duration_ms))
+        if (not self.is_running or len(self.log_buffer) >= LOG_FLUSH_SIZE
+                or time.monotonic() - self._last_log_flush >= LOG_FLUSH_INTERVAL_SECONDS):
+            self.flush_logs()
+
+    def flush_logs(self):
+        """Write all queued log entries with one batched insert"""
+        self._last_log_flush = time.monotonic()
+        rows = []
+        try:
+            # Several threads may flush at once; each takes what it pops
+            while True:
+                rows.append(self.log_buffer.popleft())
+        except IndexError:
+            pass
+        if rows and not self.db.log_polling_activity_many(rows):
+            logger.error(f"Failed to write {len(rows)} polling log entries")
+
+    def _no_new_build_result(self, component_id: int, branch_id: int, start_time: float) -> Dict[str, any]:
+        """Result of a poll that found nothing new"""
+        return {
+            'success': True,
+            'new_build': False,
+            'component_id': component_id,
+            'branch_id': branch_id,
+            'duration_ms': int((time.time() - start_time) * 1000)
+        }
 
-    def poll_all_components(self) -> List[Dict]:
+    def poll_all_components(self, respect_intervals: bool = False) -> List[Dict]:
         """
         Poll all active components/branches concurrently
+        With respect_intervals, components whose own polling interval has not
+        passed yet are skipped (see discover_build)
         Returns: List of results
         """
         if not self.is_running:
@@ -282,27 +459,60 @@ class PollingEngine:
 
         logger.info(f"Polling {len(configs)} component/branch combinations")
 
-        # Submit polling tasks to thread pool
+        # Submit discovery tasks to the polling pool; every task reports to
+        # done_queue when it finishes. New builds are then handed to the
+        # transfer pool, so long downloads never hold up discovery
+        done_queue = queue.Queue()
         futures = []
+        future_configs = {}
         for config in configs:
-            future = self.executor.submit(self.poll_component_branch, config)
+            future = self.executor.submit(self._run_counted, self.discover_build,
+                                          config, respect_intervals)
+            future.add_done_callback(done_queue.put)
             futures.append(future)
+            future_configs[future] = config
 
-        # Collect results
+        # Collect results as they finish; stop() ends the wait and cancels
+        # the polls that have not started yet
         results = []
-        for future in as_completed(futures):
+        pending = len(futures)
+        while pending:
+            if self._stop_event.is_set():
+                cancelled = sum(1 for future in futures if future.cancel())
+                logger.info(f"Polling stopped: {cancelled} pending polls cancelled")
+                break
+
+            try:
+                future = done_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            pending -= 1
+
+            if future.cancelled():
+                continue
             try:
                 result = future.result()
-                results.append(result)
             except Exception as e:
                 logger.error(f"Thread execution failed: {str(e)}")
+                continue
+
+            if result.get('transfer'):
+                transfer = self.transfer_executor.submit(
+                    self._run_counted, self.transfer_build, future_configs[future], result
+                )
+                transfer.add_done_callback(done_queue.put)
+                futures.append(transfer)
+                pending += 1
+            else:
+                results.append(result)
 
-        # Log summary
-        successful = sum(1 for r in results if r.get('success'))
-        new_builds = sum(1 for r in results if r.get('new_build'))
-        failed = sum(1 for r in results if not r.get('success'))
+        # Write the cycle's activity log entries in one go
+        self.flush_logs()
 
-        logger.info(f"Polling cycle complete: {successful} successful, {new_builds} new builds, {failed} failed")
+        # Log summary
+        summary = summarize_results(results)
+        logger.info(f"Polling cycle complete: {summary['successful']} successful, "
+                    f"{summary['new_builds']} new builds, {summary['failed']} failed")
 
         return results
 
@@ -310,6 +520,8 @@ class PollingEngine:
         """
         Run continuous polling at specified interval
         Default: 5 minutes (300 seconds)
+        A cycle that found new builds is followed by another one right away;
+        stop() ends the wait between cycles immediately
         """
         self.start()
 
@@ -318,23 +530,39 @@ class PollingEngine:
                 logger.info("=" * 60)
                 logger.info(f"Starting polling cycle at {datetime.now()}")
 
-                # Poll all components
-                results = self.poll_all_components()
+                # Poll all components that are due
+                results = self.poll_all_components(respect_intervals=True)
+
+                # Builds often come in bursts: look again at once after processing
+                # one (failed downloads wait, so they are not retried in a tight loop)
+                if any(r.get('new_build') and r.get('success') for r in results):
+                    delay = 0
+                else:
+                    delay = interval_seconds
 
                 # Wait for next cycle
-                logger.info(f"Waiting {interval_seconds} seconds for next cycle...")
-                time.sleep(interval_seconds)
+                logger.info(f"Waiting {delay} seconds for next cycle...")
+                if self._stop_event.wait(delay):
+                    break
 
         except KeyboardInterrupt:
             logger.info("Polling interrupted by user")
         finally:
-            self.stop()
+            if self.is_running:
+                self.stop()
+
+    def invalidate_config_cache(self):
+        """Re-read polling configurations and system settings on next use"""
+        self.db.invalidate_polling_config()
+        self.db.invalidate_system_config()
+        logger.info("Configuration cache cleared")
 
     def get_engine_status(self) -> Dict[str, any]:
         """Get current engine status"""
         return {
             'is_running': self.is_running,
             'max_threads': self.max_threads,
-            'active_threads': len(self.active_threads),
+            'pool_size': self.pool_size,
+            'active_threads': self.active_count,
             'jfrog_connected': self.jfrog.session is not None
         }
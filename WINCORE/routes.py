@@ -5,34 +5,168 @@ Handles all web routes for JFrog polling system management
 
 from flask import (
     render_template, request, jsonify, flash,
-    redirect, url_for, session
+    redirect, url_for, session, g
 )
 import logging
+import threading
+import time
+from functools import wraps
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from db_helper import DatabaseHelper
 from polling_engine import PollingEngine
-from download_manager import DownloadManager
-from extraction_manager import ExtractionManager
-from cleanup_manager import CleanupManager
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+
 logger = logging.getLogger(__name__)
 
+# Build retries (download + extraction) run on this many background threads
+MAX_RETRY_WORKERS = 4
+
+# Seconds a finished retry job's result stays available to retry_status
+RETRY_JOB_TTL_SECONDS = 600
+
+# Endpoints reachable without logging in
+PUBLIC_ENDPOINTS = {'login', 'static'}
+
+# Seconds the per-component JSON endpoints reuse a query result;
+# auto-refreshing widgets call them every few seconds per component
+COMPONENT_CACHE_TTL_SECONDS = 2
+
+
+def conditional_json(data):
+    """JSON response with an ETag; answers 304 when the client already has this body"""
+    response = jsonify(data)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def roles_required(*roles):
+    """Allow the route only for the given roles (g.role, set by require_login)"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if g.role not in roles:
+                if request.path.startswith('/api/') or request.method == 'POST':
+                    return jsonify({'error': 'Insufficient permissions'}), 403
+                flash('Insufficient permissions', 'error')
+                return redirect(url_for('login'))
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def register_routes(app):
     db = DatabaseHelper()
     polling_engine = PollingEngine(db)
+    # Share the engine's managers (and its JFrog session) instead of building new ones per request
+    download_manager = polling_engine.download_mgr
+    extraction_manager = polling_engine.extract_mgr
+    cleanup_manager = polling_engine.cleanup_mgr
+
+    # (kind, component_id) -> (time fetched, rows)
+    component_cache = {}
+    component_cache_lock = threading.Lock()
+
+    def cached_for_component(kind, component_id, load):
+        """Result of load(), reused for COMPONENT_CACHE_TTL_SECONDS per (kind, component_id)"""
+        now = time.monotonic()
+        with component_cache_lock:
+            entry = component_cache.get((kind, component_id))
+            if entry and now - entry[0] < COMPONENT_CACHE_TTL_SECONDS:
+                return entry[1]
+
+        result = load()
+        with component_cache_lock:
+            component_cache[(kind, component_id)] = (now, result)
+        return result
+
+    @app.before_request
+    def require_login():
+        """Every non-public route needs a logged-in user"""
+        # Read the session once; routes use g.user / g.role
+        g.user = session.get('username')
+        g.role = session.get('role')
+        if request.endpoint in PUBLIC_ENDPOINTS or g.user:
+            return None
+        if request.path.startswith('/api/'):
+            return jsonify({'error': 'Authentication required'}), 401
+        return redirect(url_for('login'))
+
+    # Retries can take minutes, so they run off the request thread;
+    # job_id -> {'build_id', 'status', 'error', 'finished'} (status: running/completed/failed);
+    # finished jobs are dropped RETRY_JOB_TTL_SECONDS after they end
+    retry_executor = ThreadPoolExecutor(max_workers=MAX_RETRY_WORKERS,
+                                        thread_name_prefix='build-retry')
+    retry_jobs = {}
+    retry_jobs_lock = threading.Lock()
+
+    def prune_retry_jobs():
+        """Drop expired finished jobs; call with retry_jobs_lock held"""
+        cutoff = time.monotonic() - RETRY_JOB_TTL_SECONDS
+        expired = [job_id for job_id, job in retry_jobs.items()
+                   if job['finished'] is not None and job['finished'] < cutoff]
+        for job_id in expired:
+            del retry_jobs[job_id]
+
+    def do_retry(job_id, build_info):
+        """Retry a failed download and/or extraction, recording the outcome in retry_jobs"""
+        error = None
+        try:
+            # Retry download if it failed
+            if build_info['download_status'] == 'failed':
+                success, path, _ = download_manager.download_and_track(
+                    component_id=build_info['component_id'],
+                    branch_id=build_info['branch_id'],
+                    component_guid=build_info['component_guid'],
+                    component_name=build_info['component_name'],
+                    url=build_info['build_url'],
+                    build_date=build_info['build_date'],
+                    build_number=build_info['build_number']
+                )
+                if not success:
+                    error = 'Download retry failed'
+                else:
+                    build_info['download_path'] = path
+
+            # Retry extraction if it failed
+            if not error and build_info['extraction_status'] == 'failed':
+                success = extraction_manager.extract_zip(
+                    zip_path=build_info['download_path'],
+                    extraction_path=build_info['extraction_path']
+                )
+                if success:
+                    db.update_extraction_status(build_info['component_id'], build_info['branch_id'],
+                                                build_info['extraction_path'])
+                else:
+                    error = 'Extraction retry failed'
+
+        except Exception as e:
+            logger.error("Error retrying build %s: %s", build_info['tracking_id'], e)
+            error = str(e)
+
+        if error:
+            # Hand the claimed statuses back so the build can be retried again
+            db.execute_non_query(
+                """
+                UPDATE jfrog_build_tracking
+                SET download_status = CASE WHEN download_status = 'downloading' THEN 'failed' ELSE download_status END,
+                    extraction_status = CASE WHEN extraction_status = 'extracting' THEN 'failed' ELSE extraction_status END,
+                    error_message = ?,
+                    updated_date = GETDATE()
+                WHERE tracking_id = ?
+                """,
+                (error, build_info['tracking_id'])
+            )
+
+        with retry_jobs_lock:
+            retry_jobs[job_id]['status'] = 'failed' if error else 'completed'
+            retry_jobs[job_id]['error'] = error
+            retry_jobs[job_id]['finished'] = time.monotonic()
 
     @app.route('/')
     @app.route('/dashboard')
     def dashboard():
         """Main dashboard showing polling system status"""
-        if 'username' not in session:
-            return redirect(url_for('login'))
-
         # Get polling statistics
         stats = db.get_polling_statistics()
         return render_template('dashboard.html', stats=stats)
@@ -40,24 +174,19 @@ def register_routes(app):
     @app.route('/components')
     def components():
         """Component management page"""
-        if 'username' not in session:
-            return redirect(url_for('login'))
-
         components = db.get_all_components_with_status()
         return render_template('components.html', components=components)
 
     @app.route('/api/components/<int:component_id>/polling', methods=['GET', 'POST'])
     def component_polling(component_id):
         """Manage polling settings for a component"""
-        if 'username' not in session:
-            return jsonify({'error': 'Authentication required'}), 401
-
         if request.method == 'GET':
-            polling_config = db.get_component_polling_config(component_id)
-            return jsonify(polling_config)
+            polling_config = cached_for_component(
+                'polling', component_id, lambda: db.get_component_polling_config(component_id))
+            return conditional_json(polling_config)
 
         elif request.method == 'POST':
-            if session.get('role') not in ['admin', 'poweruser']:
+            if g.role not in ['admin', 'poweruser']:
                 return jsonify({'error': 'Insufficient permissions'}), 403
 
             data = request.json
@@ -65,9 +194,12 @@ def register_routes(app):
                 component_id=component_id,
                 frequency=data.get('polling_frequency_seconds'),
                 is_enabled=data.get('is_enabled'),
-                updated_by=session.get('username')
+                updated_by=g.user
             )
 
+            with component_cache_lock:
+                component_cache.pop(('polling', component_id), None)
+
             return jsonify({
                 'success': success,
                 'message': 'Polling configuration updated successfully'
@@ -76,18 +208,14 @@ def register_routes(app):
     @app.route('/api/components/<int:component_id>/threads')
     def component_threads(component_id):
         """Get active polling threads for a component"""
-        if 'username' not in session:
-            return jsonify({'error': 'Authentication required'}), 401
-
-        threads = db.get_component_threads(component_id)
-        return jsonify(threads)
+        threads = cached_for_component(
+            'threads', component_id, lambda: db.get_component_threads(component_id))
+        return conditional_json(threads)
 
     @app.route('/api/polling/start', methods=['POST'])
+    @roles_required('admin')
     def start_polling():
         """Start the polling engine"""
-        if 'username' not in session or session.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-
         try:
             polling_engine.start()
             return jsonify({
@@ -95,18 +223,16 @@ def register_routes(app):
                 'message': 'Polling engine started successfully'
             })
         except Exception as e:
-            logger.error(f"Error starting polling engine: {str(e)}")
+            logger.error("Error starting polling engine: %s", e)
             return jsonify({
                 'success': False,
                 'error': str(e)
             }), 500
 
     @app.route('/api/polling/stop', methods=['POST'])
+    @roles_required('admin')
     def stop_polling():
         """Stop the polling engine"""
-        if 'username' not in session or session.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-
         try:
             polling_engine.stop()
             return jsonify({
@@ -114,7 +240,7 @@ def register_routes(app):
                 'message': 'Polling engine stopped successfully'
             })
         except Exception as e:
-            logger.error(f"Error stopping polling engine: {str(e)}")
+            logger.error("Error stopping polling engine: %s", e)
             return jsonify({
                 'success': False,
                 'error': str(e)
@@ -123,114 +249,103 @@ def register_routes(app):
     @app.route('/logs')
     def view_logs():
         """View system logs page"""
-        if 'username' not in session:
-            return redirect(url_for('login'))
-
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
         log_level = request.args.get('level', 'ALL')
-        component_id = request.args.get('component_id')
-        
-        logs = db.get_polling_logs(
+        component_id = request.args.get('component_id', type=int)
+        before_id = request.args.get('before_id', type=int)
+
+        # Only the requested page is read from the database
+        logs_page = db.get_polling_logs(
             page=page,
             per_page=per_page,
             log_level=log_level,
-            component_id=component_id
+            component_id=component_id,
+            before_id=before_id
         )
-        
-        return render_template('logs.html', logs=logs)
+
+        return render_template('logs.html', logs=logs_page['items'], pagination=logs_page,
+                               current_level=log_level)
 
     @app.route('/builds')
     def build_history():
         """View build history page"""
-        if 'username' not in session:
-            return redirect(url_for('login'))
+        component_id = request.args.get('component_id', type=int)
+        branch_id = request.args.get('branch_id', type=int)
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 50, type=int)
 
-        component_id = request.args.get('component_id')
-        branch_id = request.args.get('branch_id')
-        
-        builds = db.get_build_history(
+        builds_page = db.get_build_history(
             component_id=component_id,
-            branch_id=branch_id
+            branch_id=branch_id,
+            page=page,
+            per_page=per_page
         )
-        
-        return render_template('builds.html', builds=builds)
+
+        return render_template('builds.html', builds=builds_page['items'], pagination=builds_page)
 
     @app.route('/api/builds/<int:build_id>/retry', methods=['POST'])
+    @roles_required('admin', 'poweruser')
     def retry_build(build_id):
-        """Retry a failed build download/extraction"""
-        if 'username' not in session or session.get('role') not in ['admin', 'poweruser']:
-            return jsonify({'error': 'Insufficient permissions'}), 403
-
+        """Start retrying a failed build download/extraction; poll the returned job_id for the result"""
         try:
-            build_info = db.get_build_info(build_id)
+            # Claims the build in one UPDATE, so two clicks cannot start two retries
+            build_info = db.claim_build_for_retry(build_id)
             if not build_info:
-                return jsonify({'error': 'Build not found'}), 404
-
-            # Retry download if it failed
-            if build_info['download_status'] == 'failed':
-                download_manager = DownloadManager(db)
-                success, path = download_manager.download_and_track(
-                    component_id=build_info['component_id'],
-                    branch_id=build_info['branch_id'],
-                    component_guid=build_info['component_guid'],
-                    component_name=build_info['component_name'],
-                    url=build_info['build_url'],
-                    build_date=build_info['build_date'],
-                    build_number=build_info['build_number']
-                )
-                if not success:
-                    return jsonify({'error': 'Download retry failed'}), 500
+                return jsonify({'error': 'Build not found, not failed, or already being retried'}), 404
 
-            # Retry extraction if it failed
-            if build_info['extraction_status'] == 'failed':
-                extraction_manager = ExtractionManager(db)
-                success = extraction_manager.extract_zip(
-                    zip_path=build_info['download_path'],
-                    extraction_path=build_info['extraction_path']
-                )
-                if not success:
-                    return jsonify({'error': 'Extraction retry failed'}), 500
+            job_id = uuid.uuid4().hex
+            with retry_jobs_lock:
+                prune_retry_jobs()
+                retry_jobs[job_id] = {'build_id': build_id, 'status': 'running',
+                                      'error': None, 'finished': None}
+            retry_executor.submit(do_retry, job_id, build_info)
 
             return jsonify({
                 'success': True,
+                'job_id': job_id,
                 'message': 'Build retry initiated successfully'
-            })
+            }), 202
 
         except Exception as e:
-            logger.error(f"Error retrying build: {str(e)}")
+            logger.error("Error retrying build: %s", e)
             return jsonify({'error': str(e)}), 500
 
+    @app.route('/api/builds/retry/<job_id>')
+    def retry_status(job_id):
+        """Status of a build retry started by retry_build"""
+        with retry_jobs_lock:
+            prune_retry_jobs()
+            job = retry_jobs.get(job_id)
+            job = dict(job) if job else None
+
+        if not job:
+            return jsonify({'error': 'Retry job not found'}), 404
+        job.pop('finished')
+        return jsonify(job)
+
     @app.route('/api/cleanup/trigger', methods=['POST'])
+    @roles_required('admin')
     def trigger_cleanup():
         """Trigger manual cleanup of old builds"""
-        if 'username' not in session or session.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-
         try:
-            cleanup_manager = CleanupManager(db)
-            result = cleanup_manager.run_cleanup()
+            result = cleanup_manager.cleanup_all_components()
             return jsonify(result)
         except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
+            logger.error("Error during cleanup: %s", e)
             return jsonify({'error': str(e)}), 500
 
     @app.route('/settings')
+    @roles_required('admin')
     def settings():
         """System settings page"""
-        if 'username' not in session or session.get('role') != 'admin':
-            flash('Admin access required', 'error')
-            return redirect(url_for('login'))
-
         config = db.get_system_config()
         return render_template('settings.html', config=config)
 
     @app.route('/settings/save', methods=['POST'])
+    @roles_required('admin')
     def save_settings():
         """Save system settings"""
-        if 'username' not in session or session.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-
         try:
             settings = {
                 'JFrogBaseURL': request.form.get('jfrog_base_url'),
@@ -240,12 +355,14 @@ def register_routes(app):
                 'LogRetentionDays': request.form.get('log_retention_days')
             }
 
-            db.save_system_config(settings, session.get('username'))
+            # One UPDATE for all filled-in values; also drops their cached copies
+            settings = {key: value for key, value in settings.items() if value}
+            db.update_system_configs(settings, g.user)
             flash('Settings saved successfully', 'success')
             return redirect(url_for('settings'))
 
         except Exception as e:
-            logger.error(f"Error saving settings: {str(e)}")
+            logger.error("Error saving settings: %s", e)
             flash('Error saving settings', 'error')
             return redirect(url_for('settings'))
 
@@ -256,5 +373,5 @@ def register_routes(app):
 
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f"Internal server error: {str(error)}")
+        logger.error("Internal server error: %s", error)
         return render_template('errors/500.html'), 500
\ No newline at end of file
@@ -30,11 +30,13 @@ def setup_jfrog_config():
     print("Current Configuration:")
     print("-" * 60)
 
-    current_url = db.get_system_config('JFrogBaseURL') or 'Not set'
-    current_user = db.get_system_config('SVCJFROGUSR') or 'Not set'
-    current_base_drive = db.get_system_config('BaseDrive') or 'Not set'
-    current_max_threads = db.get_system_config('MaxConcurrentThreads') or 'Not set'
-    current_max_builds = db.get_system_config('MaxBuildsToKeep') or 'Not set'
+    current = db.get_system_configs(['JFrogBaseURL', 'SVCJFROGUSR', 'BaseDrive',
+                                     'MaxConcurrentThreads', 'MaxBuildsToKeep'])
+    current_url = current['JFrogBaseURL'] or 'Not set'
+    current_user = current['SVCJFROGUSR'] or 'Not set'
+    current_base_drive = current['BaseDrive'] or 'Not set'
+    current_max_threads = current['MaxConcurrentThreads'] or 'Not set'
+    current_max_builds = current['MaxBuildsToKeep'] or 'Not set'
 
     print(f"JFrog Base URL: {current_url}")
     print(f"JFrog Username: {current_user}")
@@ -48,25 +50,28 @@ def setup_jfrog_config():
     print("Enter new configuration (press Enter to keep current value):")
     print("-" * 60)
 
+    # New values are collected here and saved together at the end
+    updates = {}
+
     # JFrog Base URL
     new_url = input(f"JFrog Base URL [{current_url}]: ").strip()
     if new_url:
-        db.update_system_config('JFrogBaseURL', new_url, 'setup_script')
-        print(f"✓ JFrog Base URL updated to: {new_url}")
+        updates['JFrogBaseURL'] = new_url
+        print(f"✓ JFrog Base URL set to: {new_url}")
 
     # JFrog Username
     new_username = input(f"JFrog Username [{current_user}]: ").strip()
     if new_username:
-        db.update_system_config('SVCJFROGUSR', new_username, 'setup_script')
-        print(f"✓ JFrog Username updated to: {new_username}")
+        updates['SVCJFROGUSR'] = new_username
+        print(f"✓ JFrog Username set to: {new_username}")
 
     # JFrog Password
     update_password = input("Update JFrog Password? (y/n) [n]: ").strip().lower()
     if update_password == 'y':
         new_password = getpass.getpass("JFrog Password: ")
         if new_password:
-            db.update_system_config('SVCJFROGPAS', new_password, 'setup_script')
-            print("✓ JFrog Password updated")
+            updates['SVCJFROGPAS'] = new_password
+            print("✓ JFrog Password set")
 
     print()
     print("System Configuration:")
@@ -75,8 +80,8 @@ def setup_jfrog_config():
     # Base Drive
     new_base_drive = input(f"Base Drive for artifacts [{current_base_drive}]: ").strip()
     if new_base_drive:
-        db.update_system_config('BaseDrive', new_base_drive, 'setup_script')
-        print(f"✓ Base Drive updated to: {new_base_drive}")
+        updates['BaseDrive'] = new_base_drive
+        print(f"✓ Base Drive set to: {new_base_drive}")
 
     # Max Concurrent Threads
     new_max_threads = input(f"Max Concurrent Threads (1-10000) [{current_max_threads}]: ").strip()
@@ -84,8 +89,8 @@ def setup_jfrog_config():
         try:
             threads = int(new_max_threads)
             if 1 <= threads <= 10000:
-                db.update_system_config('MaxConcurrentThreads', str(threads), 'setup_script')
-                print(f"✓ Max Concurrent Threads updated to: {threads}")
+                updates['MaxConcurrentThreads'] = str(threads)
+                print(f"✓ Max Concurrent Threads set to: {threads}")
             else:
                 print("✗ Invalid value. Must be between 1 and 10000")
         except ValueError:
@@ -97,13 +102,16 @@ def setup_jfrog_config():
         try:
             builds = int(new_max_builds)
             if builds >= 1:
-                db.update_system_config('MaxBuildsToKeep', str(builds), 'setup_script')
-                print(f"✓ Max Builds to Keep updated to: {builds}")
+                updates['MaxBuildsToKeep'] = str(builds)
+                print(f"✓ Max Builds to Keep set to: {builds}")
             else:
                 print("✗ Invalid value. Must be at least 1")
         except ValueError:
             print("✗ Invalid value. Must be a number")
 
+    if updates and not db.update_system_configs(updates, 'setup_script'):
+        print("✗ Failed to save configuration")
+
     print()
     print("=" * 60)
     print("Configuration Update Complete!")
@@ -8,11 +8,6 @@ import logging
 from pathlib import Path
 import os
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Database configuration
@@ -23,6 +18,93 @@ DB_CONFIG = {
     'trusted_connection': 'yes'
 }
 
+# All tables and their indexes, sent to the server as one batch
+CREATE_TABLES_SQL = """
+    -- Components table
+    IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[components]') AND type in (N'U'))
+    BEGIN
+        CREATE TABLE [dbo].[components] (
+            component_id INT IDENTITY(1,1) PRIMARY KEY,
+            component_name NVARCHAR(255) NOT NULL,
+            component_guid NVARCHAR(50) NOT NULL,
+            repository_url NVARCHAR(500) NOT NULL,
+            polling_enabled BIT DEFAULT 1,
+            polling_frequency_seconds INT DEFAULT 300,
+            last_poll_time DATETIME,
+            created_date DATETIME DEFAULT GETDATE(),
+            created_by NVARCHAR(100),
+            modified_date DATETIME,
+            modified_by NVARCHAR(100)
+        )
+    END;
+
+    -- Build History table
+    IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[build_history]') AND type in (N'U'))
+    BEGIN
+        CREATE TABLE [dbo].[build_history] (
+            build_id INT IDENTITY(1,1) PRIMARY KEY,
+            component_id INT FOREIGN KEY REFERENCES components(component_id),
+            build_number NVARCHAR(50),
+            build_date DATETIME,
+            artifact_path NVARCHAR(500),
+            download_status NVARCHAR(20),
+            download_path NVARCHAR(500),
+            extraction_status NVARCHAR(20),
+            extraction_path NVARCHAR(500),
+            created_date DATETIME DEFAULT GETDATE(),
+            modified_date DATETIME
+        )
+    END;
+
+    -- Polling Logs table
+    IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[polling_logs]') AND type in (N'U'))
+    BEGIN
+        CREATE TABLE [dbo].[polling_logs] (
+            log_id INT IDENTITY(1,1) PRIMARY KEY,
+            component_id INT FOREIGN KEY REFERENCES components(component_id),
+            log_level NVARCHAR(20),
+            message NVARCHAR(MAX),
+            created_date DATETIME DEFAULT GETDATE()
+        )
+    END;
+
+    -- System Configuration table
+    IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[system_config]') AND type in (N'U'))
+    BEGIN
+        CREATE TABLE [dbo].[system_config] (
+            config_id INT IDENTITY(1,1) PRIMARY KEY,
+            config_key NVARCHAR(100) NOT NULL,
+            config_value NVARCHAR(MAX),
+            description NVARCHAR(500),
+            modified_date DATETIME,
+            modified_by NVARCHAR(100)
+        )
+    END;
+
+    -- Component Threads table
+    IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[component_threads]') AND type in (N'U'))
+    BEGIN
+        CREATE TABLE [dbo].[component_threads] (
+            thread_id INT IDENTITY(1,1) PRIMARY KEY,
+            component_id INT FOREIGN KEY REFERENCES components(component_id),
+            thread_status NVARCHAR(20),
+            start_time DATETIME,
+            last_heartbeat DATETIME,
+            created_date DATETIME DEFAULT GETDATE()
+        )
+    END;
+
+    -- Indexes for the columns the web UI filters and sorts on
+    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = N'IX_polling_logs_component_date')
+        CREATE INDEX IX_polling_logs_component_date ON polling_logs(component_id, created_date DESC) INCLUDE (log_level, message);
+    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = N'IX_build_history_component_date')
+        CREATE INDEX IX_build_history_component_date ON build_history(component_id, build_date DESC) INCLUDE (download_status, extraction_status);
+    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = N'IX_component_threads_component')
+        CREATE INDEX IX_component_threads_component ON component_threads(component_id) INCLUDE (thread_status, last_heartbeat);
+    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = N'IX_system_config_key')
+        CREATE UNIQUE INDEX IX_system_config_key ON system_config(config_key);
+"""
+
 def create_connection_string():
     """Create the connection string for SQL Server"""
     return (
@@ -31,176 +113,92 @@ def create_connection_string():
         f"Trusted_Connection={DB_CONFIG['trusted_connection']};"
     )
 
-def create_database():
-    """Create the WINCORE database if it doesn't exist"""
+# Default configuration values: (config_key, config_value, description)
+DEFAULT_CONFIGS = [
+    ('JFrogBaseURL', '', 'Base URL for JFrog Artifactory'),
+    ('MaxConcurrentThreads', '5', 'Maximum number of concurrent polling threads'),
+    ('DefaultPollingFrequency', '300', 'Default polling frequency in seconds'),
+    ('MaxBuildsToKeep', '5', 'Maximum number of builds to keep per component'),
+    ('LogRetentionDays', '30', 'Number of days to retain polling logs'),
+]
+
+def create_database(cursor):
+    """Create the WINCORE database if it doesn't exist and switch the connection to it"""
     try:
-        conn_str = create_connection_string()
-        with pyodbc.connect(conn_str, autocommit=True) as conn:
-            cursor = conn.cursor()
-            
-            # Check if database exists
-            cursor.execute("""
-                IF NOT EXISTS (SELECT name FROM master.sys.databases WHERE name = N'WINCORE')
-                BEGIN
-                    CREATE DATABASE WINCORE;
-                END
-            """)
-            logger.info("Database check/creation completed successfully")
-            
+        cursor.execute(f"""
+            IF NOT EXISTS (SELECT name FROM master.sys.databases WHERE name = N'{DB_CONFIG['database']}')
+            BEGIN
+                CREATE DATABASE {DB_CONFIG['database']};
+            END
+        """)
+        cursor.execute(f"USE {DB_CONFIG['database']}")
+        logger.info("Database check/creation completed successfully")
+
     except Exception as e:
-        logger.error(f"Error creating database: {str(e)}")
+        logger.error("Error creating database: %s", e)
         raise
 
-def create_tables():
+def create_tables(cursor):
     """Create all required tables for WINCORE"""
     try:
-        conn_str = create_connection_string() + f"DATABASE={DB_CONFIG['database']};"
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-
-            # Components table
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[components]') AND type in (N'U'))
-                BEGIN
-                    CREATE TABLE [dbo].[components] (
-                        component_id INT IDENTITY(1,1) PRIMARY KEY,
-                        component_name NVARCHAR(255) NOT NULL,
-                        component_guid NVARCHAR(50) NOT NULL,
-                        repository_url NVARCHAR(500) NOT NULL,
-                        polling_enabled BIT DEFAULT 1,
-                        polling_frequency_seconds INT DEFAULT 300,
-                        last_poll_time DATETIME,
-                        created_date DATETIME DEFAULT GETDATE(),
-                        created_by NVARCHAR(100),
-                        modified_date DATETIME,
-                        modified_by NVARCHAR(100)
-                    )
-                END
-            """)
-
-            # Build History table
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[build_history]') AND type in (N'U'))
-                BEGIN
-                    CREATE TABLE [dbo].[build_history] (
-                        build_id INT IDENTITY(1,1) PRIMARY KEY,
-                        component_id INT FOREIGN KEY REFERENCES components(component_id),
-                        build_number NVARCHAR(50),
-                        build_date DATETIME,
-                        artifact_path NVARCHAR(500),
-                        download_status NVARCHAR(20),
-                        download_path NVARCHAR(500),
-                        extraction_status NVARCHAR(20),
-                        extraction_path NVARCHAR(500),
-                        created_date DATETIME DEFAULT GETDATE(),
-                        modified_date DATETIME
-                    )
-                END
-            """)
-
-            # Polling Logs table
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[polling_logs]') AND type in (N'U'))
-                BEGIN
-                    CREATE TABLE [dbo].[polling_logs] (
-                        log_id INT IDENTITY(1,1) PRIMARY KEY,
-                        component_id INT FOREIGN KEY REFERENCES components(component_id),
-                        log_level NVARCHAR(20),
-                        message NVARCHAR(MAX),
-                        created_date DATETIME DEFAULT GETDATE()
-                    )
-                END
-            """)
-
-            # System Configuration table
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[system_config]') AND type in (N'U'))
-                BEGIN
-                    CREATE TABLE [dbo].[system_config] (
-                        config_id INT IDENTITY(1,1) PRIMARY KEY,
-                        config_key NVARCHAR(100) NOT NULL,
-                        config_value NVARCHAR(MAX),
-                        description NVARCHAR(500),
-                        modified_date DATETIME,
-                        modified_by NVARCHAR(100)
-                    )
-                END
-            """)
-
-            # Component Threads table
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[component_threads]') AND type in (N'U'))
-                BEGIN
-                    CREATE TABLE [dbo].[component_threads] (
-                        thread_id INT IDENTITY(1,1) PRIMARY KEY,
-                        component_id INT FOREIGN KEY REFERENCES components(component_id),
-                        thread_status NVARCHAR(20),
-                        start_time DATETIME,
-                        last_heartbeat DATETIME,
-                        created_date DATETIME DEFAULT GETDATE()
-                    )
-                END
-            """)
-
-            conn.commit()
-            logger.info("All tables created successfully")
+        cursor.execute(CREATE_TABLES_SQL)
+        logger.info("All tables created successfully")
 
     except Exception as e:
-        logger.error(f"Error creating tables: {str(e)}")
+        logger.error("Error creating tables: %s", e)
         raise
 
-def insert_default_config():
+def insert_default_config(cursor):
     """Insert default system configuration"""
     try:
-        conn_str = create_connection_string() + f"DATABASE={DB_CONFIG['database']};"
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-
-            # Default configuration values
-            default_configs = [
-                ('JFrogBaseURL', '', 'Base URL for JFrog Artifactory'),
-                ('MaxConcurrentThreads', '5', 'Maximum number of concurrent polling threads'),
-                ('DefaultPollingFrequency', '300', 'Default polling frequency in seconds'),
-                ('MaxBuildsToKeep', '5', 'Maximum number of builds to keep per component'),
-                ('LogRetentionDays', '30', 'Number of days to retain polling logs'),
-            ]
-
-            for key, value, description in default_configs:
-                cursor.execute("""
-                    IF NOT EXISTS (SELECT 1 FROM system_config WHERE config_key = ?)
-                    INSERT INTO system_config (config_key, config_value, description, modified_date)
-                    VALUES (?, ?, ?, GETDATE())
-                """, (key, key, value, description))
-
-            conn.commit()
-            logger.info("Default configuration inserted successfully")
+        # One MERGE for all rows; keys that already exist are left untouched
+        cursor.fast_executemany = True
+        cursor.executemany("""
+            MERGE system_config AS t
+            USING (SELECT ? AS config_key, ? AS config_value, ? AS description) AS s
+                ON t.config_key = s.config_key
+            WHEN NOT MATCHED THEN
+                INSERT (config_key, config_value, description, modified_date)
+                VALUES (s.config_key, s.config_value, s.description, GETDATE());
+        """, DEFAULT_CONFIGS)
+        logger.info("Default configuration inserted successfully")
 
     except Exception as e:
-        logger.error(f"Error inserting default configuration: {str(e)}")
+        logger.error("Error inserting default configuration: %s", e)
         raise
 
 def main():
     """Main function to set up the database"""
     try:
         logger.info("Starting WINCORE database setup...")
-        
-        # Create database
-        create_database()
-        logger.info("Database created/verified successfully")
 
-        # Create tables
-        create_tables()
-        logger.info("Tables created successfully")
+        # One autocommit connection for every step (CREATE DATABASE cannot
+        # run inside a transaction); create_database switches it to WINCORE
+        with pyodbc.connect(create_connection_string(), autocommit=True) as conn:
+            cursor = conn.cursor()
 
-        # Insert default configuration
-        insert_default_config()
-        logger.info("Default configuration inserted successfully")
+            # Create database
+            create_database(cursor)
+            logger.info("Database created/verified successfully")
+
+            # Create tables
+            create_tables(cursor)
+            logger.info("Tables created successfully")
+
+            # Insert default configuration
+            insert_default_config(cursor)
+            logger.info("Default configuration inserted successfully")
 
         logger.info("WINCORE database setup completed successfully")
 
     except Exception as e:
-        logger.error(f"Database setup failed: {str(e)}")
+        logger.error("Database setup failed: %s", e)
         raise
 
 if __name__ == "__main__":
+    # Logging is only configured when run as a script, not when imported
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     main()
\ No newline at end of file
@@ -3,23 +3,131 @@ SSP (Self-Service Portal) API Client
 Handles fetching JFrog credentials from SSP API
 """
 
+import json
+import time
+import threading
 import requests
-from config import SSP_CONFIG
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import get_ssp_config
 import logging
 
+# keyring is optional; with it, credentials fetched by one process are reused
+# by the next (Windows Credential Manager keeps them encrypted with DPAPI)
+try:
+    import keyring
+    HAS_KEYRING = True
+except ImportError:
+    HAS_KEYRING = False
+
 logger = logging.getLogger(__name__)
 
+# Stored credentials are reused for 15 minutes, like the in-process cache
+# in JFrogUrlBuilder
+KEYRING_SERVICE = 'WINCORE-SSP'
+CREDENTIAL_CACHE_SECONDS = 900
+
+# Credentials fetched by this process: keyring user -> (fetched, username, password)
+_credential_cache = {}
+_credential_lock = threading.Lock()
+
+
+def create_session() -> requests.Session:
+    """Session shared by all SSPClient instances, so SSP calls reuse kept-alive connections"""
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504]
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry_strategy)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = create_session()
+
 class SSPClient:
     def __init__(self):
-        self.api_url = SSP_CONFIG['api_url']
-        self.token = SSP_CONFIG['token']
-        self.env = SSP_CONFIG['env']
-        self.app_name = SSP_CONFIG['app_name']
-        self.timeout = SSP_CONFIG['timeout']
+        ssp_config = get_ssp_config()
+        self.api_url = ssp_config['api_url']
+        self.token = ssp_config['token']
+        self.env = ssp_config['env']
+        self.app_name = ssp_config['app_name']
+        self.timeout = ssp_config['timeout']
 
     def get_jfrog_credentials(self):
         """
         Fetch JFrog credentials from SSP API
+        Credentials fetched by this process or stored in the OS keyring less
+        than 15 minutes ago are used instead of calling SSP
+        Returns:
+            tuple: (username, password) if successful, (None, None) if failed
+        """
+        with _credential_lock:
+            cached = _credential_cache.get(self.keyring_user())
+        if cached and time.monotonic() - cached[0] < CREDENTIAL_CACHE_SECONDS:
+            return cached[1], cached[2]
+
+        username, password, age = self.load_stored_credentials()
+        if not (username and password):
+            username, password = self.fetch_jfrog_credentials()
+            age = 0.0
+            if username and password:
+                self.store_credentials(username, password)
+
+        if username and password:
+            # Dated by when they were fetched, so stored credentials do not
+            # get a second CREDENTIAL_CACHE_SECONDS here
+            with _credential_lock:
+                _credential_cache[self.keyring_user()] = (time.monotonic() - age, username, password)
+        return username, password
+
+    def keyring_user(self):
+        """Keyring entry name for this environment/application"""
+        return f"{self.env}:{self.app_name}"
+
+    def load_stored_credentials(self):
+        """
+        Credentials from the OS keyring if fresh
+        Returns:
+            tuple: (username, password, age in seconds), or (None, None, None)
+        """
+        if not HAS_KEYRING:
+            return None, None, None
+
+        try:
+            stored = keyring.get_password(KEYRING_SERVICE, self.keyring_user())
+            if not stored:
+                return None, None, None
+
+            entry = json.loads(stored)
+            age = max(0.0, time.time() - entry['fetched'])
+            if age >= CREDENTIAL_CACHE_SECONDS:
+                return None, None, None
+
+            logger.debug("Using stored JFrog credentials")
+            return entry['username'], entry['password'], age
+
+        except Exception as e:
+            logger.debug("Stored credentials unavailable: %s", e)
+            return None, None, None
+
+    def store_credentials(self, username, password):
+        """Save credentials and their fetch time in the OS keyring"""
+        if not HAS_KEYRING:
+            return
+
+        try:
+            entry = json.dumps({'username': username, 'password': password, 'fetched': time.time()})
+            keyring.set_password(KEYRING_SERVICE, self.keyring_user(), entry)
+        except Exception as e:
+            logger.debug("Could not store credentials: %s", e)
+
+    def fetch_jfrog_credentials(self):
+        """
+        Call the SSP API for JFrog credentials
         Returns:
             tuple: (username, password) if successful, (None, None) if failed
         """
@@ -34,7 +142,7 @@ class SSPClient:
                 'APPName': self.app_name
             }
 
-            response = requests.get(
+            response = _session.get(
                 self.api_url,
                 headers=headers,
                 json=payload,
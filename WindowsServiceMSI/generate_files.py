@@ -5,159 +5,227 @@ Generates Files.wxs with all files except the main service executable
 which is handled directly in Product.wxs with ServiceInstall
 """
 import os
+import re
 import sys
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 
-def generate_guid():
-    """Generate a new GUID for WiX components"""
-    return str(uuid.uuid4()).upper()
+# Files.wxs building blocks, filled in with str.format
+WXS_HEADER = '''<?xml version="1.0" encoding="UTF-8"?>
+<Wix xmlns="{namespace}">
+  <Fragment>
+'''
+
+DIRECTORY_TEMPLATE = '''{indent}<DirectoryRef Id="{parent_id}">
+{indent}  <Directory Id="{id}" Name="{name}" />
+{indent}</DirectoryRef>
+'''
+
+COMPONENT_TEMPLATE = '''    <DirectoryRef Id="{directory_id}">
+      <Component Id="{component_id}" Guid="{guid}">
+        <File Id="{id}"
+              Source="ServiceFiles/{source}"
+              Name="{name}"
+              KeyPath="yes" />
+      </Component>
+    </DirectoryRef>
+
+'''
+
+COMPONENT_REF_TEMPLATE = '      <ComponentRef Id="{component_id}" />\n'
+
+WXS_FOOTER = '''  </Fragment>
+</Wix>'''
+
+# Top-level folder count from which subtrees are scanned in parallel
+PARALLEL_SCAN_MIN_SUBDIRS = 8
+
+# Anything a WiX id may not contain (ids are ASCII letters, digits, '_' and '.')
+INVALID_ID_CHARS = re.compile(r'[^0-9A-Za-z_.]')
+
+# Characters that must be escaped in attribute values (one str.translate pass)
+XML_ATTR_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+def generate_guids(count):
+    """Generate count new GUIDs for WiX components (random, version 4) from one os.urandom call"""
+    blob = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=blob[i * 16:(i + 1) * 16], version=4)).upper()
+            for i in range(count)]
+
+def sanitize_id(name):
+    """Replace characters a WiX id cannot hold (spaces, '&', '-', non-ASCII...) with '_'"""
+    return INVALID_ID_CHARS.sub('_', name)
+
+def xml_attr(value):
+    """Escape a value for use inside a double-quoted XML attribute"""
+    return value.translate(XML_ATTR_ESCAPES)
 
 def get_wix_namespace_from_product():
     """Read the WiX namespace from Product.wxs"""
     try:
-        with open('Product.wxs', 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Extract namespace from Product.wxs
-            if 'xmlns="http://wixtoolset.org/schemas/v4/wxs"' in content:
-                return 'http://wixtoolset.org/schemas/v4/wxs'
-            elif 'xmlns="http://schemas.microsoft.com/wix/2006/wi"' in content:
-                return 'http://schemas.microsoft.com/wix/2006/wi'
-    except:
+        # xmlns is on the root element, so the start of the file is enough
+        with open('Product.wxs', 'rb') as f:
+            head = f.read(4096)
+        # Extract namespace from Product.wxs
+        if b'xmlns="http://wixtoolset.org/schemas/v4/wxs"' in head:
+            return 'http://wixtoolset.org/schemas/v4/wxs'
+        elif b'xmlns="http://schemas.microsoft.com/wix/2006/wi"' in head:
+            return 'http://schemas.microsoft.com/wix/2006/wi'
+    except OSError:
         pass
     return 'http://wixtoolset.org/schemas/v4/wxs'  # Default to v4
 
-def should_skip_file(file_path, service_exe_name):
-    """Check if file should be skipped (service executable)"""
-    filename = os.path.basename(file_path)
-    return filename.lower() == service_exe_name.lower()
+def should_skip_file(filename_lower, service_exe_lower):
+    """Check if file should be skipped (service executable); both names already lower-cased"""
+    return filename_lower == service_exe_lower
+
+def scan_entries(abs_path, rel_path, rel_source, dir_id, service_exe_lower, directories, files):
+    """
+    Record one directory's subdirectories and files in directories/files
+    Returns the subdirectories as (absolute path, relative path, same with '/'
+    separators, directory id) tuples; scandir entries already know whether they
+    are files or directories, so no extra stat() calls
+    """
+    subdirs = []
+
+    # File ids in this directory share this prefix (File_a_b_ for a/b)
+    if rel_path:
+        file_id_prefix = 'File_' + sanitize_id(rel_path.replace(os.sep, '_').replace('.', '_')) + '_'
+    else:
+        file_id_prefix = 'File_'
+
+    with os.scandir(abs_path) as entries:
+        for entry in entries:
+            rel_entry_path = rel_path + os.sep + entry.name if rel_path else entry.name
+            rel_entry_source = rel_source + '/' + entry.name if rel_source else entry.name
+
+            if entry.is_dir(follow_symlinks=False):
+                # Dir_a_b extends its parent's id by one part (Dir_a + _b)
+                if dir_id == 'INSTALLFOLDER':
+                    sub_dir_id = 'Dir_' + sanitize_id(entry.name)
+                else:
+                    sub_dir_id = dir_id + '_' + sanitize_id(entry.name)
+                directories[rel_entry_path] = {
+                    'id': sub_dir_id,
+                    'name': entry.name,
+                    'parent_id': dir_id,
+                    'path': rel_entry_path
+                }
+                subdirs.append((entry.path, rel_entry_path, rel_entry_source, sub_dir_id))
+
+            elif entry.is_file():
+                # Skip the service executable; Product.wxs installs it from the
+                # root of the source folder, so only root files are compared
+                if not rel_path and should_skip_file(entry.name.lower(), service_exe_lower):
+                    print(f"Skipping service executable: {entry.name}")
+                    continue
+
+                file_id = file_id_prefix + sanitize_id(entry.name.replace('.', '_'))
+                files[rel_entry_path] = {
+                    'id': file_id,
+                    'component_id': 'Comp_' + file_id,
+                    'name': entry.name,
+                    'source': rel_entry_source,
+                    'directory_id': dir_id
+                }
+
+    return subdirs
+
+def scan_tree(starts, service_exe_lower):
+    """Scan the directories in starts and everything below them; returns (directories, files)"""
+    directories = {}
+    files = {}
+
+    # Explicit stack; reversed, so directories are visited in listing order (as os.walk did)
+    stack = list(reversed(starts))
+    while stack:
+        subdirs = scan_entries(*stack.pop(), service_exe_lower, directories, files)
+        stack.extend(reversed(subdirs))
+
+    return directories, files
 
 def scan_directory(source_dir, service_exe_name):
     """Scan directory and build file/directory structure, excluding service executable"""
     if not os.path.exists(source_dir):
         print(f"Warning: Source directory '{source_dir}' does not exist")
         return {}, {}
-    
+
     directories = {}
     files = {}
-    
-    for root, dirs, file_list in os.walk(source_dir):
-        rel_path = os.path.relpath(root, source_dir)
-        
-        # Handle root directory
-        if rel_path == '.':
-            dir_id = 'INSTALLFOLDER'
-        else:
-            # Create directory structure
-            path_parts = rel_path.split(os.sep)
-            current_path = ''
-            for part in path_parts:
-                parent_path = current_path
-                current_path = os.path.join(current_path, part) if current_path else part
-                
-                if current_path not in directories:
-                    parent_id = 'INSTALLFOLDER' if not parent_path else f"Dir_{parent_path.replace(os.sep, '_')}"
-                    dir_id = f"Dir_{current_path.replace(os.sep, '_')}"
-                    directories[current_path] = {
-                        'id': dir_id,
-                        'name': part,
-                        'parent_id': parent_id,
-                        'path': current_path
-                    }
-            
-            dir_id = f"Dir_{rel_path.replace(os.sep, '_')}"
-        
-        # Process files in current directory (skip service executable)
-        for filename in file_list:
-            file_path = os.path.join(root, filename)
-            
-            # Skip the service executable
-            if should_skip_file(file_path, service_exe_name):
-                print(f"Skipping service executable: {filename}")
-                continue
-                
-            rel_file_path = os.path.relpath(file_path, source_dir)
-            
-            file_info = {
-                'id': f"File_{rel_file_path.replace(os.sep, '_').replace('.', '_')}",
-                'name': filename,
-                'source': rel_file_path.replace(os.sep, '/'),
-                'directory_id': dir_id
-            }
-            files[rel_file_path] = file_info
-    
+    service_exe_lower = service_exe_name.lower()
+
+    subdirs = scan_entries(source_dir, '', '', 'INSTALLFOLDER', service_exe_lower, directories, files)
+
+    if len(subdirs) >= PARALLEL_SCAN_MIN_SUBDIRS:
+        # Many top-level folders: scan each subtree on its own thread (scandir
+        # releases the GIL while it waits on the disk); results are merged in
+        # listing order, so the output is the same as a sequential scan
+        workers = min(len(subdirs), 32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda start: scan_tree([start], service_exe_lower), subdirs)
+            for sub_directories, sub_files in results:
+                directories.update(sub_directories)
+                files.update(sub_files)
+    else:
+        sub_directories, sub_files = scan_tree(subdirs, service_exe_lower)
+        directories.update(sub_directories)
+        files.update(sub_files)
+
     return directories, files
 
-def generate_files_wxs(directories, files, namespace):
-    """Generate the Files.wxs content"""
-    wxs_content = f'''<?xml version="1.0" encoding="UTF-8"?>
-<Wix xmlns="{namespace}">
-  <Fragment>
-'''
+def iter_files_wxs(directories, files, namespace):
+    """Yield the Files.wxs content piece by piece, from the module-level templates"""
+    yield WXS_HEADER.format(namespace=namespace)
 
     # Generate directory structure
     if directories:
-        wxs_content += '    <!-- Directory Structure -->\n'
-        
+        yield '    <!-- Directory Structure -->\n'
+
         # Group directories by parent for proper nesting
-        root_dirs = [d for d in directories.values() if d['parent_id'] == 'INSTALLFOLDER']
-        
-        def write_directory_tree(parent_dirs, indent_level=2):
-            content = ""
-            for dir_info in sorted(parent_dirs, key=lambda x: x['name']):
-                indent = "    " * indent_level
-                content += f'{indent}<DirectoryRef Id="{dir_info["parent_id"]}">\n'
-                content += f'{indent}  <Directory Id="{dir_info["id"]}" Name="{dir_info["name"]}" />\n'
-                content += f'{indent}</DirectoryRef>\n'
-            return content
-        
-        wxs_content += write_directory_tree(root_dirs)
-        wxs_content += '\n'
-
-    # Generate components for files
-    if files:
-        wxs_content += '    <!-- File Components -->\n'
-        
-        # Group files by directory
-        files_by_dir = {}
-        for file_info in files.values():
-            dir_id = file_info['directory_id']
-            if dir_id not in files_by_dir:
-                files_by_dir[dir_id] = []
-            files_by_dir[dir_id].append(file_info)
-        
-        # Generate components
-        for dir_id, dir_files in files_by_dir.items():
-            for file_info in dir_files:
-                component_id = f"Comp_{file_info['id']}"
-                guid = generate_guid()
-                
-                wxs_content += f'''    <DirectoryRef Id="{dir_id}">
-      <Component Id="{component_id}" Guid="{guid}">
-        <File Id="{file_info['id']}"
-              Source="ServiceFiles/{file_info['source']}"
-              Name="{file_info['name']}"
-              KeyPath="yes" />
-      </Component>
-    </DirectoryRef>
+        children = defaultdict(list)
+        for dir_info in directories.values():
+            children[dir_info['parent_id']].append(dir_info)
 
-'''
+        def iter_directory_tree(parent_id, indent_level=2):
+            """Each directory under parent_id, followed by its own subdirectories"""
+            indent = "    " * indent_level
+            for dir_info in sorted(children[parent_id], key=itemgetter('name')):
+                yield DIRECTORY_TEMPLATE.format(indent=indent, parent_id=dir_info['parent_id'],
+                                                id=dir_info['id'], name=xml_attr(dir_info['name']))
+                yield from iter_directory_tree(dir_info['id'], indent_level)
+
+        yield from iter_directory_tree('INSTALLFOLDER')
+        yield '\n'
 
-    # Generate feature fragment
+    # Generate components for files and, in the same pass, the feature's
+    # ComponentRefs (scan_directory already lists each directory's files together)
     if files:
-        wxs_content += '    <!-- Feature for Service Files (excluding executable) -->\n'
-        wxs_content += '    <Feature Id="ServiceFiles" Title="Service Support Files" Level="1">\n'
-        
-        for file_info in files.values():
-            component_id = f"Comp_{file_info['id']}"
-            wxs_content += f'      <ComponentRef Id="{component_id}" />\n'
-        
-        wxs_content += '    </Feature>\n\n'
-
-    wxs_content += '''  </Fragment>
-</Wix>'''
-    
-    return wxs_content
+        yield '    <!-- File Components -->\n'
+
+        feature_parts = [
+            '    <!-- Feature for Service Files (excluding executable) -->\n',
+            '    <Feature Id="ServiceFiles" Title="Service Support Files" Level="1">\n'
+        ]
+
+        # All GUIDs in one go
+        for file_info, guid in zip(files.values(), generate_guids(len(files))):
+            yield COMPONENT_TEMPLATE.format(
+                directory_id=file_info['directory_id'],
+                component_id=file_info['component_id'],
+                guid=guid,
+                id=file_info['id'],
+                source=xml_attr(file_info['source']),
+                name=xml_attr(file_info['name'])
+            )
+            feature_parts.append(COMPONENT_REF_TEMPLATE.format(component_id=file_info['component_id']))
+
+        feature_parts.append('    </Feature>\n\n')
+        yield from feature_parts
+
+    yield WXS_FOOTER
 
 def main():
     if len(sys.argv) < 3:
@@ -182,12 +250,9 @@ def main():
     
     print(f"Found {len(directories)} directories and {len(files)} files (excluding service executable)")
     
-    # Generate Files.wxs
-    wxs_content = generate_files_wxs(directories, files, namespace)
-    
-    # Write Files.wxs
-    with open('Files.wxs', 'w', encoding='utf-8') as f:
-        f.write(wxs_content)
+    # Generate and write Files.wxs; pieces go straight into a 1 MiB write buffer
+    with open('Files.wxs', 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+        f.writelines(iter_files_wxs(directories, files, namespace))
     
     print("Files.wxs generated successfully!")
     print("\nTo include in your build:")